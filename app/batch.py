@@ -0,0 +1,155 @@
+"""
+Offline bulk triage without going through HTTP.
+
+    python -m app.batch tickets.jsonl -o results.jsonl --workers 8
+
+Reads TriageInput records from JSONL (one object per line) or CSV (columns
+ticket_text, order_id), spreads them over a ProcessPoolExecutor where every
+worker holds its own compiled graph and mock_data, and writes one JSON
+result line per ticket as chunks finish. Throughput goes to stderr.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from pydantic import ValidationError
+
+# JSONL lines are passed to workers unparsed, CSV rows as dicts
+Record = Union[str, Dict[str, Any]]
+
+_main = None
+
+
+def _init_worker() -> None:
+    # load mock_data and compile the graph once per process
+    global _main
+    from app import main
+
+    main.get_graph()
+    _main = main
+
+
+def _triage_one(index: int, record: Record) -> Dict[str, Any]:
+    try:
+        if isinstance(record, str):
+            body = _main.TriageInput.model_validate_json(record)
+        else:
+            body = _main.TriageInput.model_validate(record)
+    except ValidationError as e:
+        return {"index": index, "status_code": 422, "detail": e.errors(include_url=False, include_context=False, include_input=False)}
+
+    try:
+        outcome = _main.get_graph().invoke(_main._initial_state(body))
+    except Exception as e:
+        outcome = e
+    try:
+        return _main._triage_item(index, outcome)
+    except Exception as e:
+        return {"index": index, "status_code": 500, "detail": str(e)}
+
+
+def triage_chunk(chunk: List[Tuple[int, Record]]) -> List[Dict[str, Any]]:
+    if _main is None:
+        _init_worker()
+    return [_triage_one(index, record) for index, record in chunk]
+
+
+def read_tickets(f: TextIO, fmt: str) -> Iterator[Record]:
+    if fmt == "csv":
+        for row in csv.DictReader(f):
+            yield {"ticket_text": row.get("ticket_text") or "", "order_id": row.get("order_id") or None}
+        return
+    for line in f:
+        if line.strip():
+            yield line
+
+
+def _chunks(records: Iterable[Record], size: int) -> Iterator[List[Tuple[int, Record]]]:
+    it = enumerate(records)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(
+    records: Iterable[Record],
+    out: TextIO,
+    workers: int,
+    chunk_size: int = 256,
+    log: Optional[TextIO] = sys.stderr,
+    progress_every: float = 5.0,
+) -> int:
+    """
+    Triage records across `workers` processes and write result lines to out.
+    At most 2 chunks per worker are queued, so input is read lazily and
+    memory doesn't grow with the size of the dump. Returns tickets processed.
+    """
+    started = last_report = time.perf_counter()
+    done_count = 0
+    chunks = _chunks(records, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(triage_chunk, chunk))
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                for item in fut.result():
+                    out.write(json.dumps(item) + "\n")
+                    done_count += 1
+            out.flush()
+
+            now = time.perf_counter()
+            if log and now - last_report >= progress_every:
+                last_report = now
+                log.write(f"{done_count} tickets, {done_count / (now - started):.1f} tickets/s\n")
+
+    elapsed = time.perf_counter() - started
+    if log:
+        rate = done_count / elapsed if elapsed else 0.0
+        log.write(f"done: {done_count} tickets in {elapsed:.2f}s ({rate:.1f} tickets/s, {workers} workers)\n")
+    return done_count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.batch", description="Offline bulk ticket triage.")
+    parser.add_argument("input", help="JSONL or CSV file of tickets ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="where to write JSONL results (default stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="input format (default: from extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=256, help="tickets per worker task")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    fin = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        run(read_tickets(fin, fmt), fout, workers=args.workers, chunk_size=args.chunk_size)
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+# weight of a rule without one in issues.json (the old fixed confidence)
+DEFAULT_WEIGHT = 0.85
+
+
+class LabelScore(NamedTuple):
+    issue_type: str
+    score: float  # 0..1
+    rules: Tuple[int, ...]  # indexes of the matched rules behind it
+
+
+def _lower_all(texts: Sequence[str]) -> Sequence[str]:
+    # one lower() over the whole batch instead of one per text
+    lowered = "\0".join(texts).lower().split("\0")
+    # a NUL inside a text would shift the split; fall back per text
+    return lowered if len(lowered) == len(texts) else [t.lower() for t in texts]
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over the keywords in issues.json.
+
+    The automaton is built once; matching walks the ticket text a single
+    time regardless of how many rules there are. scores() collects every
+    matching rule and scores each issue type from the rules' weights.
+
+    The goto/fail tables are also resolved into one transition dict per
+    state, so the walk takes a single lookup per character.
+    """
+
+    def __init__(self, rules: Iterable[Dict[str, Any]]):
+        self.rules: List[Dict[str, Any]] = list(rules)
+        # per rule: 1 - weight and an index into self._labels (issue types in
+        # order of their first rule), as flat arrays for scores_many()
+        self._rule_miss = array("d")
+        self._rule_label = array("i")
+        label_idx: Dict[str, int] = {}
+        for rule in self.rules:
+            weight = float(rule.get("weight", DEFAULT_WEIGHT))
+            if not 0 < weight <= 1:
+                raise ValueError(f"rule {rule['keyword']!r}: weight must be in (0, 1], got {weight}")
+            self._rule_miss.append(1.0 - weight)
+            self._rule_label.append(label_idx.setdefault(rule["issue_type"], len(label_idx)))
+        self._labels: List[str] = list(label_idx)
+        # an empty keyword is "in" every text, so it matches unconditionally
+        self._always_rules: Tuple[int, ...] = tuple(idx for idx, r in enumerate(self.rules) if not r["keyword"])
+
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+
+        for idx, rule in enumerate(self.rules):
+            keyword = rule["keyword"]
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(idx)
+
+        fail = [0] * len(goto)
+        # delta[state][ch]: the state after ch, fail links already followed;
+        # a character missing from it leads back to the root
+        delta: List[Dict[str, int]] = [dict(g) for g in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                # inherit matches ending at the fail state (BFS order guarantees it is final)
+                outputs[nxt].extend(outputs[fail[nxt]])
+            if state:
+                # the fail state is shallower, so its row is already complete
+                delta[state] = {**delta[fail[state]], **goto[state]}
+
+        self._delta = delta
+        self._outputs: List[Tuple[int, ...]] = [tuple(sorted(set(o))) for o in outputs]
+
+    def scores(self, text: str) -> List[LabelScore]:
+        """
+        Every issue type with a matching rule, best first.
+
+        A rule's weight is read as the probability that a ticket containing
+        its keyword has that issue type, and matched rules are combined as
+        independent evidence: score = 1 - prod(1 - weight). One hit keeps its
+        weight, each further distinct hit raises the score toward 1. Ties go
+        to the issue type whose first rule comes first in issues.json.
+        """
+        return self.scores_many([text], lowercase=False)[0]
+
+    def scores_many(self, texts: Sequence[str], lowercase: bool = True) -> List[List[LabelScore]]:
+        """
+        scores() for a batch. Texts are lower-cased in one call, the
+        automaton tables are bound once, and the walk writes every text's
+        matched rules into one flat array('i') (text i owns
+        hits[offsets[i]:offsets[i + 1]], ascending) before they are scored.
+        """
+        if lowercase:
+            texts = _lower_all(texts)
+
+        delta, outputs, always = self._delta, self._outputs, self._always_rules
+        hits = array("i")
+        offsets = array("i", [0])
+        for text in texts:
+            matched = set(always)
+            state = 0
+            for ch in text:
+                state = delta[state].get(ch, 0)
+                if outputs[state]:
+                    matched.update(outputs[state])
+            if matched:
+                hits.extend(sorted(matched))
+            offsets.append(len(hits))
+
+        labels, rule_miss, rule_label = self._labels, self._rule_miss, self._rule_label
+        results: List[List[LabelScore]] = []
+        for i in range(len(texts)):
+            start, end = offsets[i], offsets[i + 1]
+            if start == end:
+                results.append([])
+                continue
+            miss: Dict[int, float] = {}
+            by_label: Dict[int, List[int]] = {}
+            for idx in hits[start:end]:
+                label = rule_label[idx]
+                if label in miss:
+                    miss[label] *= rule_miss[idx]
+                    by_label[label].append(idx)
+                else:
+                    miss[label] = rule_miss[idx]
+                    by_label[label] = [idx]
+            ranked = [LabelScore(labels[l], round(1.0 - m, 4), tuple(by_label[l])) for l, m in miss.items()]
+            ranked.sort(key=lambda s: (-s.score, s.rules[0]))
+            results.append(ranked)
+        return results
@@ -1,296 +1,553 @@
-
-from fastapi import FastAPI, HTTPException, Query
-from pydantic import BaseModel
-import json, os, re
-from typing import Annotated, Optional, TypedDict, List, Dict, Any
-
-# --- LangGraph / LangChain imports ---
-from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages, AnyMessage
-from langgraph.prebuilt import ToolNode
-from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-from langchain_core.tools import tool
-
-app = FastAPI(title="Phase 1 Mock API")
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from contextlib import asynccontextmanager
+import asyncio, json, os, threading
+from collections import Counter
+from typing import AsyncIterator, List, Dict, Any, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: TriageJSONResponse falls back to the stdlib encoder
+    orjson = None
+
+# LangGraph / langchain_core are only imported by app.triage_graph, on the
+# first triage (or by the lifespan warm-up) -- see get_graph().
+
+from app.metrics import (
+    CONTENT_TYPE_LATEST, ISSUE_TYPES, STARTUP_SECONDS, TRIAGE_DURATION, TRIAGE_OUTCOMES,
+    MetricsMiddleware, render_latest,
+)
+from app.classifier import KeywordMatcher, LabelScore
+from app.mock_data import MockData, MockDataWatcher
+from app.order_backends import AsyncSqliteBackend, OrderBackend, StoreBackend
+from app.order_cache import OrderCache
+from app.order_ids import DEFAULT_PATTERNS, OrderIdExtractor
+from app.orders import SEARCH_LIMIT, SEARCH_MAX_LIMIT
+from app.response_cache import ResponseCache, triage_key
+from app.similarity import SimilarityClassifier
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 MOCK_DIR = os.path.join(ROOT, "mock_data")
 
-def load(name):
-    with open(os.path.join(MOCK_DIR, name), "r", encoding="utf-8") as f:
-        return json.load(f)
+# Optional on-disk order catalog (build with `python -m app.orders`); when
+# set, orders are served from it instead of loading orders.json into memory
+ORDERS_DB = os.getenv("ORDERS_DB") or None
 
-ORDERS = load("orders.json")
-ISSUES = load("issues.json")
-REPLIES = load("replies.json")
+# Current mock_data snapshot (orders, rules, templates and their indexes).
+# Always read it through DATA at call time: the watcher replaces the whole
+# object on reload, so a reader sees either the old or the new snapshot.
+DATA = MockData.load(MOCK_DIR, orders_db=ORDERS_DB)
 
-class TriageInput(BaseModel):
-    ticket_text: str
-    order_id: str | None = None
+# Seconds between mock_data change checks; 0 disables hot reload
+MOCK_DATA_RELOAD_INTERVAL = float(os.getenv("MOCK_DATA_RELOAD_INTERVAL", "2"))
 
-@app.get("/health")
-def health(): return {"status": "ok"}
+# Tickets whose top issue_type scores below this are flagged needs_review
+# (for routing to a human) by /classify/* and /triage/invoke
+CLASSIFY_REVIEW_THRESHOLD = float(os.getenv("CLASSIFY_REVIEW_THRESHOLD", "0.7"))
 
-@app.get("/orders/get")
-def orders_get(order_id: str = Query(...)):
-    for o in ORDERS:
-        if o["order_id"] == order_id: return o
-    raise HTTPException(status_code=404, detail="Order not found")
+# Similarity fallback for tickets no keyword rule matches, built from the
+# labeled conversations in interactions/ (SIMILARITY_FALLBACK=0 disables);
+# SIMILARITY_BUDGET_MS bounds each ticket's scoring; tickets over it stay unknown
+INTERACTIONS_DIR = os.path.join(ROOT, "interactions")
+SIMILARITY_FALLBACK = os.getenv("SIMILARITY_FALLBACK", "1") != "0"
+SIMILARITY_BUDGET = float(os.getenv("SIMILARITY_BUDGET_MS", "5")) / 1000
+SIMILARITY = SimilarityClassifier.from_interactions(INTERACTIONS_DIR) if SIMILARITY_FALLBACK else None
 
-@app.get("/orders/search")
-def orders_search(customer_email: str | None = None, q: str | None = None):
-    matches = []
-    for o in ORDERS:
-        if customer_email and o["email"].lower() == customer_email.lower():
-            matches.append(o)
-        elif q and (o["order_id"].lower() in q.lower() or o["customer_name"].lower() in q.lower()):
-            matches.append(o)
-    return {"results": matches}
+# Compile the graph in the background at server startup (set 0 to compile on first triage)
+WARM_GRAPH = os.getenv("TRIAGE_WARM_GRAPH", "1") != "0"
 
-@app.post("/classify/issue")
-def classify_issue(payload: dict):
-    text = payload.get("ticket_text", "").lower()
-    for rule in ISSUES:
-        if rule["keyword"] in text:
-            return {"issue_type": rule["issue_type"], "confidence": 0.85}
-    return {"issue_type": "unknown", "confidence": 0.1}
 
-def render_reply(issue_type: str, order):
-    template = next((r["template"] for r in REPLIES if r["issue_type"] == issue_type), None)
-    if not template: template = "Hi {{customer_name}}, we are reviewing order {{order_id}}."
-    return template.replace("{{customer_name}}", order.get("customer_name","Customer")).replace("{{order_id}}", order.get("order_id",""))
+def _swap_data(data: MockData) -> None:
+    global DATA
+    DATA = data
+    ORDER_CACHE.invalidate()
+    TRIAGE_CACHE.clear()
 
-@app.post("/reply/draft")
-def reply_draft(payload: dict):
-    issue_type = str(payload.get("issue_type") or "unknown")
-    return {"reply_text": render_reply(
-        issue_type, 
-        payload.get("order", {})
-        )
-    }
-
-# ---------- LangGraph: State, tools, and nodes ----------
 
+# Where /orders/* and the async graph path look orders up:
+# - "memory": the current DATA.order_store (in-memory, or ORDERS_DB on disk)
+# - "sql": pooled async connections to the ORDERS_DB catalog
+ORDER_BACKEND = os.getenv("ORDER_BACKEND", "memory")
 
-class TriageState(TypedDict):
-    # required by assignment
-    messages: Annotated[List[AnyMessage], add_messages]
-    ticket_text: str
-    order_id: Optional[str]
-    issue_type: Optional[str]
-    evidence: Optional[str]
-    recommendation: Optional[str]
 
-    # internal convenience fields
-    order: Optional[Dict[str, Any]]
+def make_order_backend() -> OrderBackend:
+    if ORDER_BACKEND == "sql":
+        if not ORDERS_DB:
+            raise RuntimeError("ORDER_BACKEND=sql needs ORDERS_DB pointing at an order catalog")
+        return AsyncSqliteBackend(
+            ORDERS_DB,
+            pool_size=int(os.getenv("ORDER_BACKEND_POOL_SIZE", "8")),
+            acquire_timeout=float(os.getenv("ORDER_BACKEND_ACQUIRE_TIMEOUT", "1.0")),
+            query_timeout=float(os.getenv("ORDER_BACKEND_QUERY_TIMEOUT", "2.0")),
+        )
+    return StoreBackend(lambda: DATA.order_store)
 
 
-# --- Tool for fetching orders (used by ToolNode) ---
+order_backend = make_order_backend()
 
+# LRU + TTL cache in front of fetch_order_tool and /orders/get (size 0 disables)
+ORDER_CACHE = OrderCache(
+    maxsize=int(os.getenv("ORDER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("ORDER_CACHE_TTL", "30")),
+    negative_ttl=float(os.getenv("ORDER_CACHE_NEGATIVE_TTL", "5")),
+)
 
-@tool
-def fetch_order_tool(order_id: str) -> Dict[str, Any]:
-    """Look up an order in the mock database."""
-    for o in ORDERS:
-        if o["order_id"] == order_id:
-            return o
-    # Raise ValueError so FastAPI can surface a clean 404 later
-    raise ValueError(f"Order {order_id} not found")
+# Finished /triage/invoke responses keyed by (ticket_text, order_id, mock_data
+# versions), so retried / duplicate submissions skip the graph (size 0 disables)
+TRIAGE_CACHE = ResponseCache(
+    maxsize=int(os.getenv("TRIAGE_CACHE_SIZE", "0")),
+    ttl=float(os.getenv("TRIAGE_CACHE_TTL", "60")),
+)
 
 
-tool_node = ToolNode([fetch_order_tool])
+# Order ID formats extract_order_id looks for in ticket text, as a JSON list
+# (see app.order_ids.DEFAULT_PATTERNS for the entry format)
+ORDER_ID_EXTRACTOR = OrderIdExtractor(json.loads(os.getenv("ORDER_ID_PATTERNS") or "null") or DEFAULT_PATTERNS)
 
 
-# --- Graph nodes ---
+_graph = None
+_graph_lock = threading.Lock()
 
 
-def ingest_node(state: TriageState) -> Dict[str, Any]:
+def get_graph():
     """
-    Ingest the incoming ticket text into the messages list.
+    The compiled triage graph. The first call imports LangGraph and
+    compiles it (timed into triage_startup_seconds{phase="graph"}).
     """
-    ticket_text = state["ticket_text"]
-    return {"messages": [HumanMessage(content=ticket_text)]}
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                t0 = time.perf_counter()
+                from app.triage_graph import graph
+
+                STARTUP_SECONDS.set(time.perf_counter() - t0, "graph")
+                _graph = graph
+    return _graph
+
+
+def __getattr__(name: str):
+    # keep `from app.main import graph` working without compiling at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    watcher = None
+    if MOCK_DATA_RELOAD_INTERVAL > 0:
+        watcher = MockDataWatcher(MOCK_DIR, _swap_data, interval=MOCK_DATA_RELOAD_INTERVAL, orders_db=ORDERS_DB)
+        watcher.start()
+    # compile off the event loop so /health and /orders/* answer right away
+    warmup = asyncio.get_running_loop().run_in_executor(None, get_graph) if WARM_GRAPH else None
+    yield
+    if warmup:
+        await warmup
+    if watcher:
+        watcher.stop()
+    await order_backend.close()
+
+
+app = FastAPI(title="Phase 1 Mock API", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
+class TriageInput(BaseModel):
+    ticket_text: str
+    order_id: str | None = None
 
-def classify_issue_node(state: TriageState) -> Dict[str, Any]:
+class TriageMessage(BaseModel):
+    type: str
+    content: Any
+
+class IssueLabel(BaseModel):
+    issue_type: str
+    score: float
+
+class OrderReply(BaseModel):
+    order_id: str
+    reply_text: str
+
+class TriageOutput(BaseModel):
+    order_id: str
+    issue_type: str
+    evidence: str | None = None
+    confidence: float
+    needs_review: bool
+    # "keyword" or "similarity" (the fallback); None when nothing matched
+    source: str | None = None
+    labels: List[IssueLabel]
+    order: Dict[str, Any]
+    reply_text: str
+    # tickets naming several orders: every order, and one reply per order
+    # (order / order_id are then the first of them, reply_text all replies)
+    orders: List[Dict[str, Any]] | None = None
+    replies: List[OrderReply] | None = None
+    # debug transcript of the graph run; omitted with include_messages=false
+    messages: List[TriageMessage | str] | None = None
+
+
+class TriageJSONResponse(JSONResponse):
     """
-    Classify the issue using simple keyword rules (from issues.json).
+    Encodes with orjson when it is installed. Routes return it directly, so
+    FastAPI's response_model (kept for the OpenAPI schema) doesn't
+    re-validate and jsonable_encoder the dict on every request.
     """
-    text = state["ticket_text"].lower()
-    issue_type = "unknown"
-    evidence = "no matching keyword found"
-
-    for rule in ISSUES:
-        if rule["keyword"] in text:
-            issue_type = rule["issue_type"]
-            evidence = f"matched keyword '{rule['keyword']}'"
-            break
-
-    # we also append an AI message describing classification
-    explanation = f"Detected issue_type='{issue_type}' ({evidence})."
-    return {
-        "issue_type": issue_type,
-        "evidence": evidence,
-        "messages": [AIMessage(content=explanation)],
-    }
 
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
 
-def extract_order_id_node(state: TriageState) -> Dict[str, Any]:
-    """
-    Extract order_id from either the provided field or the ticket text.
-    This implements the 'control flow: extract order_id if missing'.
-    """
-    order_id = state.get("order_id")
-    if not order_id:
-        m = re.search(r"(ORD\d{4})", state["ticket_text"], re.IGNORECASE)
-        if m:
-            order_id = m.group(1).upper()
-    return {"order_id": order_id}
+@app.get("/health")
+def health(): return {"status": "ok"}
 
+@app.get("/metrics")
+def metrics():
+    return Response(render_latest(), media_type=CONTENT_TYPE_LATEST)
 
-def fetch_order_node(state: TriageState) -> Dict[str, Any]:
+@app.get("/orders/get")
+async def orders_get(order_id: str = Query(...)):
+    try:
+        o = await ORDER_CACHE.alookup(order_id, order_backend.get)
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="order backend unavailable")
+    if o: return o
+    raise HTTPException(status_code=404, detail="Order not found")
+
+@app.get("/orders/search")
+async def orders_search(
+    customer_email: str | None = None,
+    q: str | None = None,
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    cursor: str | None = None,
+):
+    try:
+        results, next_cursor = await order_backend.search(
+            customer_email=customer_email, q=q, limit=limit, cursor=cursor
+        )
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="order backend unavailable")
+    return {"results": results, "next_cursor": next_cursor}
+
+@app.post("/orders/cache/invalidate")
+def orders_cache_invalidate(order_id: str | None = None):
+    """Drop one order (or, without order_id, every order) from ORDER_CACHE."""
+    ORDER_CACHE.invalidate(order_id)
+    return {"invalidated": order_id or "all", "hits": ORDER_CACHE.hits, "misses": ORDER_CACHE.misses}
+
+def rank_issue_types(ticket_texts: List[str], classifier: Optional[KeywordMatcher] = None) -> List[List[LabelScore]]:
     """
-    Use ToolNode to call fetch_order_tool and attach the order to state.
+    Ranked issue types per ticket: keyword rules first (the batch
+    lower-cased once), then the similarity fallback, in one batch, for the
+    tickets no rule matched. Fallback scores carry no rules. Pass the
+    classifier of the snapshot the caller resolves rule indexes against;
+    it defaults to the current DATA.classifier.
     """
-    order_id = state.get("order_id")
-    if not order_id:
-        # let FastAPI transform this into a 400 later
-        raise ValueError("order_id missing and not found in text")
-
-    # Create an AIMessage with a tool call
-    tool_calls = [
-        {
-            "name": "fetch_order_tool",
-            "args": {"order_id": order_id},
-            "id": "fetch_order_tool-1",
-        }
-    ]
-    ai_msg = AIMessage(content="", tool_calls=tool_calls)
-
-    # Run the tool node with existing messages + this tool-call message
-    result_state = tool_node.invoke({"messages": state["messages"] + [ai_msg]})
-    messages = result_state["messages"]
-    last_msg = messages[-1]
-
-    # ToolNode returns a ToolMessage as the last message
-    if isinstance(last_msg, ToolMessage):
-        content = last_msg.content
-        if isinstance(content, str):
-            try:
-                order = json.loads(content)
-            except Exception:
-                order = {"raw": content}
-        else:
-            order = content
-    else:
-        order = None
-
-    return {"messages": messages, "order": order}
-
-
-def draft_reply_node(state: TriageState) -> Dict[str, Any]:
+    ranked = (classifier or DATA.classifier).scores_many(ticket_texts)
+    misses = [i for i, r in enumerate(ranked) if not r]
+    if misses and SIMILARITY is not None:
+        fallback = SIMILARITY.scores_many([ticket_texts[i] for i in misses], budget=SIMILARITY_BUDGET)
+        for i, r in zip(misses, fallback):
+            ranked[i] = r
+    return ranked
+
+def classification(ranked: List[LabelScore]) -> Dict[str, Any]:
     """
-    Draft a reply using the issue_type and order (mock template-based).
+    API shape of a rank_issue_types() result: the top issue_type and its
+    score, whether that is too weak to act on without a human, which stage
+    decided it, and every matching issue_type ranked. A similarity score
+    is a cosine, not on the keyword-probability scale the threshold is set
+    for, so fallback results always go to review.
     """
-    order = state.get("order") or {}
-    issue_type = state.get("issue_type") or "unknown"
-    reply_text = render_reply(issue_type, order)
-    ai_msg = AIMessage(content=reply_text)
-
+    issue_type, confidence = (ranked[0].issue_type, ranked[0].score) if ranked else ("unknown", 0.0)
+    source = None if not ranked else "keyword" if ranked[0].rules else "similarity"
     return {
-        "messages": [ai_msg],
-        "recommendation": reply_text,
+        "issue_type": issue_type,
+        "confidence": confidence,
+        "needs_review": source != "keyword" or confidence < CLASSIFY_REVIEW_THRESHOLD,
+        "source": source,
+        "labels": [{"issue_type": s.issue_type, "score": s.score} for s in ranked],
     }
 
+@app.post("/classify/issue")
+def classify_issue(payload: dict):
+    (ranked,) = rank_issue_types([payload.get("ticket_text", "")])
+    result = classification(ranked)
+    ISSUE_TYPES.inc(result["issue_type"])
+    return result
 
-# --- Graph wiring ---
-
+class ClassifyBatchInput(BaseModel):
+    ticket_texts: List[str]
 
-def route_after_classify(state: TriageState) -> str:
+def classify_texts(ticket_texts: List[str]) -> List[Dict[str, Any]]:
     """
-    Conditional edge:
-    - If we already have an order_id (provided or previously extracted),
-      go directly to fetch_order.
-    - Otherwise, go to extract_order_id first.
+    Bulk /classify/issue: one result per ticket, in input order, with the
+    keyword and fallback stages each run once over the batch.
     """
-    if state.get("order_id"):
-        return "fetch_order"
-    return "extract_order_id"
-
-
-graph_builder = StateGraph(TriageState)
+    results = [classification(ranked) for ranked in rank_issue_types(ticket_texts)]
+    for issue_type, n in Counter(r["issue_type"] for r in results).items():
+        ISSUE_TYPES.inc(issue_type, amount=n)
+    return results
 
-graph_builder.add_node("ingest", ingest_node)
-graph_builder.add_node("classify_issue", classify_issue_node)
-graph_builder.add_node("extract_order_id", extract_order_id_node)
-graph_builder.add_node("fetch_order", fetch_order_node)
-graph_builder.add_node("draft_reply", draft_reply_node)
-
-graph_builder.add_edge(START, "ingest")
-graph_builder.add_edge("ingest", "classify_issue")
-
-graph_builder.add_conditional_edges(
-    "classify_issue",
-    route_after_classify,
-    {
-        "fetch_order": "fetch_order",
-        "extract_order_id": "extract_order_id",
-    },
-)
+@app.post("/classify/batch")
+def classify_batch(body: ClassifyBatchInput):
+    return TriageJSONResponse({"results": classify_texts(body.ticket_texts)})
 
-graph_builder.add_edge("extract_order_id", "fetch_order")
-graph_builder.add_edge("fetch_order", "draft_reply")
-graph_builder.add_edge("draft_reply", END)
-
-graph = graph_builder.compile()
-# If you set LANGCHAIN_TRACING_V2 + LANGCHAIN_API_KEY env vars,
-# this graph will automatically send traces to LangSmith.
+def render_reply(issue_type: str, order):
+    return DATA.reply_templates.render(issue_type, order)
 
-@app.post("/triage/invoke")
+@app.post("/reply/draft")
+def reply_draft(payload: dict):
+    issue_type = str(payload.get("issue_type") or "unknown")
+    return {"reply_text": render_reply(
+        issue_type, 
+        payload.get("order", {})
+        )
+    }
 
-def triage_invoke(body: TriageInput):
-    # initial state for the graph
-    initial_state: TriageState = {
+def _initial_state(body: TriageInput) -> Dict[str, Any]:
+    return {
         "messages": [],
         "ticket_text": body.ticket_text,
         "order_id": body.order_id,
+        "order_ids": None,
         "issue_type": None,
+        "confidence": None,
+        "needs_review": None,
+        "source": None,
+        "labels": None,
         "evidence": None,
         "recommendation": None,
         "order": None,
+        "orders": [],
+        "replies": None,
     }
 
-    try:
-        result = graph.invoke(initial_state)
-    except ValueError as e:
-        # map our ValueErrors to HTTP errors similar to the original impl
-        msg = str(e)
-        if "not found in text" in msg:
-            raise HTTPException(status_code=400, detail="order_id missing and not found in text")
-        if "not found" in msg:
-            raise HTTPException(status_code=404, detail="order not found")
-        raise
 
+def _triage_error(e: Exception) -> HTTPException | None:
+    if isinstance(e, TimeoutError):
+        return HTTPException(status_code=503, detail="order backend unavailable")
+    # map our ValueErrors to HTTP errors similar to the original impl
+    msg = str(e)
+    if "not found in text" in msg:
+        return HTTPException(status_code=400, detail="order_id missing and not found in text")
+    if "not found" in msg:
+        return HTTPException(status_code=404, detail="order not found")
+    return None
+
+
+_MESSAGE_TYPES = frozenset({"HumanMessage", "AIMessage", "ToolMessage"})
+
+
+def _serialize_messages(messages: List[Any]) -> List[Dict[str, Any] | str]:
+    # For debugging/demo, we serialize messages into strings
+    return [
+        {"type": type(m).__name__, "content": m.content} if type(m).__name__ in _MESSAGE_TYPES else str(m)
+        for m in messages
+    ]
+
+
+def _triage_response(result: Dict[str, Any], include_messages: bool = True) -> Dict[str, Any]:
     if not result.get("order_id"):
         raise HTTPException(status_code=400, detail="order_id missing and not found in text")
     if not result.get("order"):
         raise HTTPException(status_code=404, detail="order not found")
 
-    # For debugging/demo, we serialize messages into strings
-    serialized_messages = []
-    for m in result["messages"]:
-        if isinstance(m, (HumanMessage, AIMessage, ToolMessage)):
-            serialized_messages.append(
-                {"type": m.__class__.__name__, "content": m.content}
-            )
-        else:
-            serialized_messages.append(str(m))
-
-    return {
+    response = {
         "order_id": result["order_id"],
         "issue_type": result["issue_type"],
         "evidence": result["evidence"],
+        "confidence": result["confidence"],
+        "needs_review": result["needs_review"],
+        "source": result["source"],
+        "labels": result["labels"],
         "order": result["order"],
         "reply_text": result["recommendation"],
-        "messages": serialized_messages,
     }
+    if result.get("replies"):
+        # in reply order (the fan-out branches append them as they finish)
+        by_id = {o["order_id"]: o for o in result["orders"]}
+        response["orders"] = [by_id[r["order_id"]] for r in result["replies"]]
+        response["replies"] = result["replies"]
+    if include_messages:
+        response["messages"] = _serialize_messages(result["messages"])
+    return response
+
+
+@app.post(
+    "/triage/invoke",
+    response_model=TriageOutput,
+    response_class=TriageJSONResponse,
+)
+async def triage_invoke(body: TriageInput, include_messages: bool = True):
+    key = None
+    if TRIAGE_CACHE.enabled:
+        # versions of the snapshot this request starts on: a reload mid-run
+        # leaves the result under the old key, where nobody will look for it
+        key = triage_key(body.ticket_text, body.order_id, DATA.versions, include_messages)
+        cached = TRIAGE_CACHE.get(key)
+        if cached is not None:
+            TRIAGE_OUTCOMES.inc("200")
+            return TriageJSONResponse(cached)
+
+    t0 = time.perf_counter()
+    try:
+        outcome = await get_graph().ainvoke(_initial_state(body))
+    except (ValueError, TimeoutError) as e:
+        outcome = e
+    finally:
+        TRIAGE_DURATION.observe(time.perf_counter() - t0)
+
+    item = _triage_item(0, outcome, include_messages)
+    if item["status_code"] != 200:
+        raise HTTPException(status_code=item["status_code"], detail=item["detail"])
+    if key is not None:
+        # only successes: a 404 may be an order that is about to exist
+        TRIAGE_CACHE.put(key, item["result"])
+    return TriageJSONResponse(item["result"])
+
+
+def _triage_item(index: int, outcome: Dict[str, Any] | Exception, include_messages: bool = True) -> Dict[str, Any]:
+    """Per-ticket entry: the triage result or its 400/404/503, counted by status."""
+    try:
+        if isinstance(outcome, (ValueError, TimeoutError)):
+            raise _triage_error(outcome) or outcome
+        if isinstance(outcome, Exception):
+            raise outcome
+        item = {"index": index, "status_code": 200, "result": _triage_response(outcome, include_messages)}
+    except HTTPException as e:
+        item = {"index": index, "status_code": e.status_code, "detail": e.detail}
+    TRIAGE_OUTCOMES.inc(str(item["status_code"]))
+    return item
+
+
+# Upper bound on tickets run through the graph at once by /triage/batch and /triage/stream
+BATCH_MAX_CONCURRENCY = int(os.getenv("TRIAGE_BATCH_MAX_CONCURRENCY", "16"))
+
+
+async def _timed_triage(state: Dict[str, Any]) -> Any:
+    """One graph run timed into TRIAGE_DURATION: its final state, or the exception it raised."""
+    t0 = time.perf_counter()
+    try:
+        return await get_graph().ainvoke(state)
+    except Exception as e:
+        return e
+    finally:
+        TRIAGE_DURATION.observe(time.perf_counter() - t0)
+
+
+@app.post("/triage/batch")
+async def triage_batch(
+    body: List[TriageInput],
+    max_concurrency: int = Query(BATCH_MAX_CONCURRENCY, ge=1),
+):
+    """
+    Triage many tickets in one request, at most max_concurrency graph runs
+    at a time. Each item reports its own status_code, so a 400/404 ticket
+    doesn't fail the whole batch.
+    """
+    slots = asyncio.Semaphore(max_concurrency)
+
+    async def run(body: TriageInput) -> Any:
+        async with slots:
+            return await _timed_triage(_initial_state(body))
+
+    results = await asyncio.gather(*(run(b) for b in body))
+
+    return {"results": [_triage_item(index, result) for index, result in enumerate(results)]}
+
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    buf = b""
+    async for chunk in request.stream():
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buf.strip():
+        yield buf
+
+
+async def _stream_triage_one(index: int, line: bytes) -> Dict[str, Any]:
+    try:
+        body = TriageInput.model_validate_json(line)
+    except ValidationError as e:
+        TRIAGE_OUTCOMES.inc("422")
+        return {"index": index, "status_code": 422, "detail": e.errors(include_url=False, include_context=False, include_input=False)}
+
+    outcome = await _timed_triage(_initial_state(body))
+    try:
+        return _triage_item(index, outcome)
+    except Exception:
+        # headers are already sent, so report it in-band instead of a 500
+        return {"index": index, "status_code": 500, "detail": "internal error"}
+
+
+async def _stream_triage(lines: AsyncIterator[bytes], max_concurrency: int) -> AsyncIterator[str]:
+    """
+    Keep at most max_concurrency tickets in flight and yield one NDJSON line
+    per ticket as it completes. The next input line is only read once a slot
+    frees up, and results are only produced as fast as the client reads
+    them, so memory stays flat regardless of input size.
+    """
+    pending: set = set()
+    index = 0
+    try:
+        async for line in lines:
+            if len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                done = {t for t in pending if t.done()}
+                pending -= done
+            for t in done:
+                yield json.dumps(t.result()) + "\n"
+
+            pending.add(asyncio.create_task(_stream_triage_one(index, line)))
+            index += 1
+
+        for t in asyncio.as_completed(pending):
+            yield json.dumps(await t) + "\n"
+        pending = set()
+    finally:
+        # client went away mid-stream: don't leave graph runs behind
+        for t in pending:
+            t.cancel()
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator reads the request body itself.
+    The stock class listens for the client disconnecting by calling receive()
+    next to the generator, which would swallow request body chunks; here the
+    generator's request.stream() is the only reader and sees the disconnect.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@app.post("/triage/stream")
+async def triage_stream(
+    request: Request,
+    max_concurrency: int = Query(BATCH_MAX_CONCURRENCY, ge=1),
+):
+    """
+    Bulk triage over NDJSON: one TriageInput per request line in, one
+    result line (with its input index and status_code) out per ticket, in
+    completion order.
+    """
+    return _DuplexStreamingResponse(
+        _stream_triage(_ndjson_lines(request), max_concurrency),
+        media_type="application/x-ndjson",
+    )
+
+
+STARTUP_SECONDS.set(time.perf_counter() - _IMPORT_STARTED, "import")
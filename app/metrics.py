@@ -0,0 +1,203 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Observations are a bisect plus a few integer adds under a lock, so the hot
+path stays cheap and nothing needs a network service (unlike LangSmith).
+"""
+
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# seconds; tuned for sub-millisecond nodes up to multi-second requests
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+REGISTRY: List["_Metric"] = []
+
+
+def _escape(value: Any) -> str:
+    # label values come from data (e.g. issues.json issue types); escape as the text format requires
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labelvalues, v in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {v}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = value
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labelvalues, v in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {v}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # per label set: [count per bucket (+Inf last), total count, sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][idx] += 1
+            series[1] += 1
+            series[2] += value
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(labelvalues)
+        return series[1] if series else 0
+
+    def time(self, *labelvalues: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator timing a sync or async callable into this histogram."""
+
+        def decorator(fn):
+            if inspect.iscoroutinefunction(fn):
+
+                @wraps(fn)
+                async def awrapper(*args, **kwargs):
+                    t0 = time.perf_counter()
+                    try:
+                        return await fn(*args, **kwargs)
+                    finally:
+                        self.observe(time.perf_counter() - t0, *labelvalues)
+
+                return awrapper
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - t0, *labelvalues)
+
+            return wrapper
+
+        return decorator
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labelvalues, (counts, total, sum_) in sorted(self._series.items()):
+            labels = _labels(self.labelnames, labelvalues)
+            cumulative = 0
+            for bound, c in zip(self.buckets + ("+Inf",), counts):
+                cumulative += c
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            lines.append(f"{self.name}_count{labels} {total}")
+            lines.append(f"{self.name}_sum{labels} {sum_}")
+        return lines
+
+
+def render_latest() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# --- triage metrics ---
+
+NODE_DURATION = Histogram("triage_node_duration_seconds", "Time spent in each triage graph node.", ["node"])
+TRIAGE_DURATION = Histogram("triage_duration_seconds", "End-to-end graph run time per ticket.")
+HTTP_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ["method", "route"])
+ISSUE_TYPES = Counter("triage_issue_type_total", "Tickets classified, by issue_type.", ["issue_type"])
+ORDER_CACHE_REQUESTS = Counter("order_cache_requests_total", "Order cache lookups by result (hit/miss).", ["result"])
+ORDER_LOOKUPS_COALESCED = Counter(
+    "order_lookups_coalesced_total", "Order lookups that joined an identical in-flight lookup."
+)
+STARTUP_SECONDS = Gauge("triage_startup_seconds", "Cold-start cost by phase (import of app.main, graph compile).", ["phase"])
+TRIAGE_OUTCOMES = Counter("triage_outcomes_total", "Triage results by status code (200/400/404/...).", ["status_code"])
+CLASSIFY_FALLBACK = Counter(
+    "classify_fallback_total", "Similarity fallback results for keyword misses (hit/miss/skipped over budget).", ["result"]
+)
+TRIAGE_CACHE_REQUESTS = Counter(
+    "triage_cache_requests_total", "Triage response cache lookups by result (hit/miss).", ["result"]
+)
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware timing every HTTP request by route template.
+    (BaseHTTPMiddleware would add a task and a stream wrapper per request.)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # the router fills in scope["route"] once it has matched; unmatched
+            # paths share one label so scanners can't blow up cardinality
+            route = scope.get("route")
+            HTTP_DURATION.observe(time.perf_counter() - t0, scope["method"], getattr(route, "path", "unmatched"))
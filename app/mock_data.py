@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.classifier import KeywordMatcher
+from app.orders import OrderStore, SqliteOrderStore
+from app.templates import ReplyTemplates
+
+logger = logging.getLogger(__name__)
+
+MOCK_FILES = ("orders.json", "issues.json", "replies.json")
+
+
+class MockData:
+    """
+    One consistent snapshot of mock_data plus everything built from it
+    (order indexes, classifier automaton, compiled reply templates).
+
+    A snapshot is fully built before anyone can see it and never mutated
+    afterwards, so a reload is just rebinding one reference.
+    """
+
+    def __init__(
+        self,
+        orders: List[Dict[str, Any]],
+        issues: List[Dict[str, Any]],
+        replies: List[Dict[str, Any]],
+        versions: Optional[Dict[str, str]] = None,
+        order_store: Any = None,
+    ):
+        self.orders = orders
+        self.issues = issues
+        self.replies = replies
+        # short content hash per file, e.g. {"issues.json": "3f2a9c0d1b7e"}
+        self.versions = versions or {}
+
+        # an on-disk store (SqliteOrderStore) can be passed in instead of
+        # indexing `orders` in memory
+        self.order_store = order_store if order_store is not None else OrderStore(orders)
+        self.classifier = KeywordMatcher(issues)
+        self.reply_templates = ReplyTemplates(replies)
+
+    @classmethod
+    def load(cls, mock_dir: str, orders_db: Optional[str] = None) -> "MockData":
+        """
+        Read mock_data. With orders_db, orders come from that SQLite catalog
+        and orders.json is not read into memory at all.
+        """
+        raw = {}
+        for name in MOCK_FILES:
+            if orders_db and name == "orders.json":
+                continue
+            with open(os.path.join(mock_dir, name), "rb") as f:
+                raw[name] = f.read()
+        versions = {name: hashlib.sha1(data).hexdigest()[:12] for name, data in raw.items()}
+
+        order_store = None
+        if orders_db:
+            st = os.stat(orders_db)
+            versions["orders.json"] = f"db-{st.st_mtime_ns:x}-{st.st_size:x}"
+            order_store = SqliteOrderStore(orders_db)
+
+        return cls(
+            orders=json.loads(raw["orders.json"]) if not orders_db else [],
+            issues=json.loads(raw["issues.json"]),
+            replies=json.loads(raw["replies.json"]),
+            versions=versions,
+            order_store=order_store,
+        )
+
+
+class MockDataWatcher:
+    """
+    Polls the mock_data files and, when one changes, builds a new MockData
+    on a background thread and hands it to on_reload. A file that fails to
+    parse (e.g. caught mid-write) is logged and the current snapshot stays.
+    """
+
+    def __init__(
+        self,
+        mock_dir: str,
+        on_reload: Callable[[MockData], None],
+        interval: float = 2.0,
+        orders_db: Optional[str] = None,
+    ):
+        self.mock_dir = mock_dir
+        self.orders_db = orders_db
+        self.on_reload = on_reload
+        self.interval = interval
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stat(self) -> Tuple[Optional[Tuple[int, int]], ...]:
+        sig = []
+        paths = [os.path.join(self.mock_dir, name) for name in MOCK_FILES]
+        if self.orders_db:
+            # a rebuilt catalog is renamed into place, which changes its mtime
+            paths[0] = self.orders_db
+        for path in paths:
+            try:
+                st = os.stat(path)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append(None)
+        return tuple(sig)
+
+    def check(self) -> bool:
+        """Reload if any file changed since the last check; True if swapped."""
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+
+        try:
+            data = MockData.load(self.mock_dir, orders_db=self.orders_db)
+        except (OSError, ValueError, KeyError, TypeError, sqlite3.Error):
+            logger.exception("mock_data reload failed; keeping current snapshot")
+            return False
+
+        self.on_reload(data)
+        logger.info("mock_data reloaded: %s", data.versions)
+        return True
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mock-data-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
@@ -0,0 +1,158 @@
+"""
+Async order backends used by the order routes and the async graph path.
+
+StoreBackend wraps the in-process store of the current mock_data snapshot
+(OrderStore or SqliteOrderStore). AsyncSqliteBackend stands in for a real
+database: a bounded pool of aiosqlite connections over a catalog built by
+app.orders.build_order_db, shared by all concurrent requests.
+"""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from app.orders import SEARCH_LIMIT, Page, get_many_sql, page_from_rows, rows_by_id, search_sql
+
+
+class OrderBackend(ABC):
+    """Async order lookup interface. close() is optional."""
+
+    @abstractmethod
+    async def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def get_many(self, order_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """The known ones among order_ids, by ID, in one round trip."""
+
+    @abstractmethod
+    async def search(
+        self,
+        customer_email: Optional[str] = None,
+        q: Optional[str] = None,
+        limit: int = SEARCH_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Page:
+        """One page of matches plus the cursor for the next page (see OrderStore.search)."""
+
+    async def close(self) -> None:
+        pass
+
+
+class StoreBackend(OrderBackend):
+    """Serves lookups from whatever store `store` returns at call time."""
+
+    def __init__(self, store: Callable[[], Any]):
+        self._store = store
+
+    async def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        return self._store().get(order_id)
+
+    async def get_many(self, order_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        return self._store().get_many(order_ids)
+
+    async def search(
+        self,
+        customer_email: Optional[str] = None,
+        q: Optional[str] = None,
+        limit: int = SEARCH_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Page:
+        return self._store().search(customer_email=customer_email, q=q, limit=limit, cursor=cursor)
+
+
+class AsyncSqliteBackend(OrderBackend):
+    """
+    Pooled async SQL backend. At most pool_size connections are opened and
+    reused across requests; waiting longer than acquire_timeout for a free
+    connection, or longer than query_timeout for a query, raises TimeoutError.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pool_size: int = 8,
+        acquire_timeout: float = 1.0,
+        query_timeout: float = 2.0,
+        mmap_size: int = 1 << 30,
+    ):
+        self.path = path
+        self.pool_size = pool_size
+        self.acquire_timeout = acquire_timeout
+        self.query_timeout = query_timeout
+        self.mmap_size = mmap_size
+        self.opened = 0  # connections opened over the backend's lifetime
+        self._idle: List[Any] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one event loop; connections don't,
+        # so only the semaphore is rebuilt if we're driven from a new loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.pool_size)
+        return self._slots
+
+    async def _connect(self):
+        import aiosqlite
+
+        conn = await aiosqlite.connect(f"file:{self.path}?mode=ro", uri=True)
+        await conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        self.opened += 1
+        return conn
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        slots = self._semaphore()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("order backend pool exhausted") from None
+        try:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                yield conn
+            except BaseException:
+                # the connection may be mid-query (e.g. timed out); don't reuse it
+                await conn.close()
+                raise
+            self._idle.append(conn)
+        finally:
+            slots.release()
+
+    async def _fetch(self, sql: str, params: tuple) -> List[tuple]:
+        async with self.connection() as conn:
+            try:
+                return await asyncio.wait_for(conn.execute_fetchall(sql, params), self.query_timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError("order backend query timed out") from None
+
+    async def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        rows = await self._fetch("SELECT doc FROM orders WHERE order_id = ?", (order_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    async def get_many(self, order_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not order_ids:
+            return {}
+        return rows_by_id(await self._fetch(*get_many_sql(order_ids)))
+
+    async def search(
+        self,
+        customer_email: Optional[str] = None,
+        q: Optional[str] = None,
+        limit: int = SEARCH_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Page:
+        query = search_sql(customer_email, q, limit, cursor)
+        if query is None:
+            return [], None
+        return page_from_rows(await self._fetch(*query), limit)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await conn.close()
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.metrics import ORDER_CACHE_REQUESTS, ORDER_LOOKUPS_COALESCED
+from app.single_flight import SingleFlight
+
+Order = Optional[Dict[str, Any]]
+
+
+class OrderCache:
+    """
+    Bounded LRU cache with TTL in front of order lookups.
+
+    Unknown order IDs are cached too (as None, for negative_ttl seconds) so
+    a burst of tickets for a bad ID doesn't reach the backend every time.
+    Concurrent misses for the same ID are coalesced into one backend lookup.
+    maxsize=0 disables caching (coalescing still applies).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float = 30.0,
+        negative_ttl: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Order]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.flight = SingleFlight(on_shared=ORDER_LOOKUPS_COALESCED.inc)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, order_id: str) -> Tuple[bool, Order]:
+        """(True, order_or_None) on a fresh hit, (False, None) otherwise."""
+        with self._lock:
+            entry = self._entries.get(order_id)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(order_id)
+                    self.hits += 1
+                    ORDER_CACHE_REQUESTS.inc("hit")
+                    return True, entry[1]
+                del self._entries[order_id]
+            self.misses += 1
+        ORDER_CACHE_REQUESTS.inc("miss")
+        return False, None
+
+    def put(self, order_id: str, order: Order) -> None:
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if order is not None else self.negative_ttl
+        with self._lock:
+            self._entries[order_id] = (self._clock() + ttl, order)
+            self._entries.move_to_end(order_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, order_id: Optional[str] = None) -> None:
+        """Drop one order, or everything when order_id is None."""
+        with self._lock:
+            if order_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(order_id, None)
+
+    def lookup(self, order_id: str, load: Callable[[str], Order]) -> Order:
+        hit, order = self.get(order_id)
+        if hit:
+            return order
+
+        def load_and_put(key: str) -> Order:
+            order = load(key)
+            self.put(key, order)
+            return order
+
+        return self.flight.do(order_id, load_and_put)
+
+    async def alookup(self, order_id: str, load: Callable[[str], Awaitable[Order]]) -> Order:
+        hit, order = self.get(order_id)
+        if hit:
+            return order
+
+        async def load_and_put(key: str) -> Order:
+            order = await load(key)
+            self.put(key, order)
+            return order
+
+        return await self.flight.ado(order_id, load_and_put)
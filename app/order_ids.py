@@ -0,0 +1,75 @@
+import re
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+
+# Order-ID formats recognised in ticket text. An entry is a regex, whose
+# match is upper-cased with separators dropped, so "ord-1002" and "ORD 1002"
+# both resolve to ORD1002; or a [regex, format] pair where format builds the
+# canonical ID verbatim from the match ("{0}" the whole match, "{1}".. its
+# groups), for IDs that keep separators, e.g.
+#     ["order (?:no\\.?|number) ?(\\d{4})", "ORD{1}"]
+#     ["SHP[-_ ]?(\\d{4})[-_ ]?(\\d{4})", "SHP-{1}-{2}"]
+DEFAULT_PATTERNS = (r"ORD[-_ ]?\d{4}",)
+
+Pattern = Union[str, Sequence[str]]
+
+_SEPARATORS = re.compile(r"[^0-9A-Za-z]+")
+
+
+def normalize(raw: str) -> str:
+    return _SEPARATORS.sub("", raw).upper()
+
+
+class OrderIdMatch(NamedTuple):
+    order_id: str  # canonical
+    start: int
+    end: int
+    pattern: int  # index into the extractor's patterns
+
+
+class OrderIdExtractor:
+    """
+    Finds every order ID in a text in one scan.
+
+    All patterns are compiled once into a single alternation with one named
+    group per pattern, so the text is scanned once however many formats are
+    configured. Matches don't overlap; where two patterns match at the same
+    position the earlier pattern wins. Patterns may use unnamed groups only.
+    """
+
+    def __init__(self, patterns: Sequence[Pattern] = DEFAULT_PATTERNS, flags: int = re.IGNORECASE):
+        if not patterns:
+            raise ValueError("at least one order ID pattern is required")
+        self.patterns: List[Tuple[str, Optional[str]]] = [
+            (p, None) if isinstance(p, str) else tuple(p) for p in patterns
+        ]
+
+        # per pattern: its format (None: normalize the match) and the combined
+        # regex's group numbers for its wrapper group ("{0}") and its own
+        # groups ("{1}"..)
+        self._formats: List[Tuple[Optional[str], range]] = []
+        parts, group = [], 1
+        for i, (regex, fmt) in enumerate(self.patterns):
+            compiled = re.compile(regex, flags)  # report a bad pattern on its own
+            if compiled.groupindex:
+                raise ValueError(f"order ID pattern {regex!r} uses named groups")
+            parts.append(f"(?P<p{i}>{regex})")
+            self._formats.append((fmt, range(group, group + 1 + compiled.groups)))
+            group += 1 + compiled.groups
+        self._regex = re.compile("|".join(parts), flags)
+
+    def extract(self, text: str) -> List[OrderIdMatch]:
+        """Every match, in order of appearance (the same ID may repeat)."""
+        matches = []
+        for m in self._regex.finditer(text):
+            pattern = int(m.lastgroup[1:])
+            fmt, groups = self._formats[pattern]
+            if fmt is None:
+                order_id = normalize(m.group(groups[0]))
+            else:
+                order_id = fmt.format(*(m.group(g) or "" for g in groups))
+            matches.append(OrderIdMatch(order_id, m.start(), m.end(), pattern))
+        return matches
+
+    def order_ids(self, text: str) -> List[str]:
+        """Distinct canonical IDs in order of first appearance."""
+        return list(dict.fromkeys(m.order_id for m in self.extract(text)))
@@ -0,0 +1,314 @@
+import argparse
+import heapq
+import json
+import os
+import re
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# default page size for search(); /orders/search caps limit at SEARCH_MAX_LIMIT
+SEARCH_LIMIT = 50
+SEARCH_MAX_LIMIT = 1000
+
+Page = Tuple[List[Dict[str, Any]], Optional[str]]
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def order_tokens(o: Dict[str, Any]) -> Set[str]:
+    """Search tokens of an order: customer name, email, order_id, item SKUs and names."""
+    parts = [o.get("customer_name") or "", o.get("email") or "", o["order_id"]]
+    for item in o.get("items") or ():
+        parts.append(item.get("sku") or "")
+        parts.append(item.get("name") or "")
+    return set(tokenize(" ".join(parts)))
+
+
+def _dedup(ranks: Iterable[int]) -> Iterator[int]:
+    prev = None
+    for r in ranks:
+        if r != prev:
+            yield r
+            prev = r
+
+
+class OrderStore:
+    """
+    In-memory order catalog indexed by order_id and by lowercased email.
+    Indexes are built once at load time so lookups don't scan the catalog.
+
+    For search() orders are also ranked by lowercased order_id: a sorted
+    list of IDs doubles as the prefix index, and an inverted index maps each
+    token to the sorted ranks of the orders containing it.
+    """
+
+    def __init__(self, orders: Iterable[Dict[str, Any]]):
+        self._orders: List[Dict[str, Any]] = list(orders)
+        self._by_id: Dict[str, Dict[str, Any]] = {o["order_id"]: o for o in self._orders}
+
+        self._ranked = sorted(self._orders, key=lambda o: o["order_id"].lower())
+        self._ids: List[str] = [o["order_id"].lower() for o in self._ranked]
+        self._email_ranks: Dict[str, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        for rank, o in enumerate(self._ranked):
+            self._email_ranks.setdefault(o["email"].lower(), []).append(rank)
+            for token in order_tokens(o):
+                self._postings.setdefault(token, []).append(rank)
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._orders)
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(order_id)
+
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """The known ones among order_ids, by ID."""
+        return {i: self._by_id[i] for i in order_ids if i in self._by_id}
+
+    def search(
+        self,
+        customer_email: Optional[str] = None,
+        q: Optional[str] = None,
+        limit: int = SEARCH_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Page:
+        """
+        Orders whose email equals customer_email, or that match every token
+        of q (as a name / email / SKU / item-name token, or as an order_id
+        prefix). Results are ordered by order_id and paged: pass the returned
+        next_cursor back as cursor for the following page. Candidates are
+        generated lazily, so only limit + 1 matches are ever materialized.
+        """
+        start = bisect_right(self._ids, cursor.lower()) if cursor else 0
+        streams = []
+        if customer_email:
+            streams.append(self._from(self._email_ranks.get(customer_email.lower(), []), start))
+        tokens = set(tokenize(q)) if q else set()
+        if tokens:
+            streams.append(self._match(tokens, start))
+
+        results: List[Dict[str, Any]] = []
+        for rank in _dedup(heapq.merge(*streams)):
+            if len(results) == limit:
+                return results, results[-1]["order_id"]
+            results.append(self._ranked[rank])
+        return results, None
+
+    @staticmethod
+    def _from(ranks: List[int], start: int) -> Iterator[int]:
+        return (ranks[i] for i in range(bisect_left(ranks, start), len(ranks)))
+
+    def _match(self, tokens: Set[str], start: int) -> Iterator[int]:
+        # per token: (posting list, [lo, hi) rank range of order_ids with that prefix)
+        conds = []
+        for t in tokens:
+            conds.append((
+                self._postings.get(t, []),
+                bisect_left(self._ids, t),
+                bisect_left(self._ids, t + "\uffff"),
+            ))
+        # drive from the most selective token and verify the rest per candidate
+        conds.sort(key=lambda c: len(c[0]) + (c[2] - c[1]))
+        (postings, lo, hi), others = conds[0], conds[1:]
+
+        candidates = heapq.merge(self._from(postings, start), range(max(lo, start), hi))
+        for rank in _dedup(candidates):
+            if all(self._has(c, rank) for c in others):
+                yield rank
+
+    @staticmethod
+    def _has(cond: Tuple[List[int], int, int], rank: int) -> bool:
+        postings, lo, hi = cond
+        if lo <= rank < hi:
+            return True
+        i = bisect_left(postings, rank)
+        return i < len(postings) and postings[i] == rank
+
+
+# --- on-disk catalog ---
+
+_SCHEMA = """
+CREATE TABLE orders (
+    pos INTEGER PRIMARY KEY,     -- catalog order
+    order_id TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL,         -- lowercased
+    search_id TEXT NOT NULL,     -- lowercased order_id: search order and prefix index
+    doc TEXT NOT NULL            -- the order as JSON
+);
+CREATE INDEX orders_email ON orders (email, search_id);
+CREATE INDEX orders_search_id ON orders (search_id);
+-- inverted index: one row per (token, order), see order_tokens()
+CREATE TABLE order_tokens (
+    token TEXT NOT NULL,
+    search_id TEXT NOT NULL,
+    PRIMARY KEY (token, search_id)
+) WITHOUT ROWID;
+"""
+
+
+def search_sql(
+    customer_email: Optional[str],
+    q: Optional[str],
+    limit: int,
+    cursor: Optional[str],
+) -> Optional[Tuple[str, list]]:
+    """
+    SQL + params implementing OrderStore.search semantics against a catalog
+    from build_order_db. Fetches limit + 1 rows so the caller can tell
+    whether there is a next page. None when there is nothing to match.
+    """
+    alternatives, params = [], []
+    if customer_email:
+        alternatives.append("email = ?")
+        params.append(customer_email.lower())
+    tokens = sorted(set(tokenize(q))) if q else []
+    if tokens:
+        conds = []
+        for t in tokens:
+            conds.append(
+                "(search_id IN (SELECT search_id FROM order_tokens WHERE token = ?)"
+                " OR (search_id >= ? AND search_id < ?))"
+            )
+            params += [t, t, t + "\uffff"]
+        alternatives.append("(" + " AND ".join(conds) + ")")
+    if not alternatives:
+        return None
+
+    sql = "SELECT doc FROM orders WHERE (" + " OR ".join(alternatives) + ")"
+    if cursor:
+        sql += " AND search_id > ?"
+        params.append(cursor.lower())
+    sql += " ORDER BY search_id LIMIT ?"
+    params.append(limit + 1)
+    return sql, params
+
+
+def get_many_sql(order_ids: Iterable[str]) -> Tuple[str, list]:
+    """One query resolving a batch of order IDs (see rows_by_id)."""
+    ids = list(dict.fromkeys(order_ids))
+    return f"SELECT order_id, doc FROM orders WHERE order_id IN ({', '.join('?' * len(ids))})", ids
+
+
+def rows_by_id(rows: Iterable[tuple]) -> Dict[str, Dict[str, Any]]:
+    return {order_id: json.loads(doc) for order_id, doc in rows}
+
+
+def page_from_rows(rows: Iterable[tuple], limit: int) -> Page:
+    results = [json.loads(doc) for (doc,) in rows]
+    if len(results) > limit:
+        results = results[:limit]
+        return results, results[-1]["order_id"]
+    return results, None
+
+
+def build_order_db(orders: Iterable[Dict[str, Any]], path: str) -> int:
+    """
+    Write orders into a SQLite catalog for SqliteOrderStore. Built next to
+    the target and renamed into place, so readers never see a partial file.
+    Returns the number of orders written.
+    """
+    tmp = f"{path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(_SCHEMA)
+        for o in orders:
+            search_id = o["order_id"].lower()
+            conn.execute(
+                "INSERT INTO orders (order_id, email, search_id, doc) VALUES (?, ?, ?, ?)",
+                (o["order_id"], o["email"].lower(), search_id, json.dumps(o, separators=(",", ":"))),
+            )
+            conn.executemany(
+                "INSERT INTO order_tokens (token, search_id) VALUES (?, ?)",
+                ((token, search_id) for token in order_tokens(o)),
+            )
+        conn.commit()
+        count = conn.execute("SELECT count(*) FROM orders").fetchone()[0]
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+    return count
+
+
+class SqliteOrderStore:
+    """
+    Read-only order catalog backed by a SQLite file (see build_order_db).
+
+    Orders stay on disk and are decoded per lookup, so the catalog can be
+    larger than RAM. The file is memory-mapped (mmap_size), so every uvicorn
+    worker reading it shares the same OS page cache instead of holding its
+    own copy. Same interface as OrderStore.
+    """
+
+    def __init__(self, path: str, mmap_size: int = 1 << 30):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections shouldn't be shared across threads; one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            conn.execute("PRAGMA query_only = 1")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT count(*) FROM orders").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for (doc,) in self._conn().execute("SELECT doc FROM orders ORDER BY pos"):
+            yield json.loads(doc)
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT doc FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return rows_by_id(self._conn().execute(*get_many_sql(order_ids)))
+
+    def search(
+        self,
+        customer_email: Optional[str] = None,
+        q: Optional[str] = None,
+        limit: int = SEARCH_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Page:
+        """Same matching and paging as OrderStore.search, evaluated inside SQLite."""
+        query = search_sql(customer_email, q, limit, cursor)
+        if query is None:
+            return [], None
+        return page_from_rows(self._conn().execute(*query), limit)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.orders", description="Build the on-disk order catalog used with ORDERS_DB."
+    )
+    parser.add_argument("orders_json", help="orders JSON array, e.g. mock_data/orders.json")
+    parser.add_argument("db_path", help="SQLite file to write")
+    args = parser.parse_args(argv)
+
+    with open(args.orders_json, "r", encoding="utf-8") as f:
+        count = build_order_db(json.load(f), args.db_path)
+    print(f"wrote {count} orders to {args.db_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
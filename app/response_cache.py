@@ -0,0 +1,76 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from app.metrics import TRIAGE_CACHE_REQUESTS
+
+# mock_data files a triage response depends on: rules, templates, orders
+KEY_FILES = ("issues.json", "replies.json", "orders.json")
+
+
+def triage_key(ticket_text: str, order_id: Optional[str], versions: Mapping[str, str], *variant: Any) -> str:
+    """
+    Content address of a triage request against one mock_data snapshot.
+    `variant` distinguishes response shapes for the same input (e.g. with
+    or without the messages transcript).
+    """
+    parts = [ticket_text, order_id] + [versions.get(name) for name in KEY_FILES] + list(variant)
+    return hashlib.sha256(json.dumps(parts, separators=(",", ":")).encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Bounded LRU of finished triage responses, keyed by triage_key().
+
+    The key includes the mock_data versions, so a response is never served
+    against rules, templates or orders other than the ones it was built
+    from; clear() additionally frees the stale entries on reload. ttl bounds
+    staleness for order data that changes behind ORDERS_DB. maxsize=0
+    disables the cache.
+    """
+
+    def __init__(self, maxsize: int = 0, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    TRIAGE_CACHE_REQUESTS.inc("hit")
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+        TRIAGE_CACHE_REQUESTS.inc("miss")
+        return None
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,195 @@
+"""
+Offline fallback classifier for tickets no issues.json keyword matches.
+
+Labeled examples (the user turns of the conversations in interactions/)
+are turned into TF-IDF vectors over hashed word and character n-grams and
+averaged into one centroid per issue_type. The centroids are kept as a
+sparse label x feature matrix stored by column (feature -> labels that
+have it), so scoring a ticket only touches the features it contains.
+"""
+
+import json
+import math
+import os
+import re
+import time
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.classifier import LabelScore
+from app.metrics import CLASSIFY_FALLBACK
+
+_WORD = re.compile(r"[a-z0-9']+")
+_DIGITS = re.compile(r"\d")
+
+# hashed feature space; collisions only merge rare n-grams at this size
+N_FEATURES = 1 << 20
+
+
+def _word_hashes(word: str) -> Tuple[int, ...]:
+    grams = ["w:" + word]
+    padded = f" {word} "
+    for n in (3, 4):
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    # crc32 rather than hash(): stable across processes (app.batch workers)
+    return tuple(zlib.crc32(gram.encode()) & (N_FEATURES - 1) for gram in grams)
+
+
+def features(
+    text: str,
+    max_chars: int = 1000,
+    memo: Optional[Dict[str, Tuple[int, ...]]] = None,
+    deadline: Optional[float] = None,
+) -> Optional[Dict[int, float]]:
+    """
+    Sublinear term frequencies of the hashed word unigrams and character
+    3/4-grams (within word boundaries) of text. Digits are folded to 0 so
+    order IDs don't look like content. Only the first max_chars count.
+    Hashing dominates the cost, so each distinct word is hashed once per
+    memo (pass one dict to share it over many texts). None if the
+    time.perf_counter() deadline passes before every word is hashed.
+    """
+    if memo is None:
+        memo = {}
+    counts: Dict[int, int] = {}
+    for word in _WORD.findall(_DIGITS.sub("0", text[:max_chars].lower())):
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        hashes = memo.get(word)
+        if hashes is None:
+            hashes = memo[word] = _word_hashes(word)
+        for h in hashes:
+            counts[h] = counts.get(h, 0) + 1
+    return {h: 1.0 + math.log(c) for h, c in counts.items()}
+
+
+def _normalized(vec: Dict[int, float]) -> Dict[int, float]:
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    return {h: v / norm for h, v in vec.items()} if norm else {}
+
+
+def interaction_examples(interactions_dir: str) -> List[Tuple[str, str]]:
+    """
+    (text, issue_type) for the opening user turn of every labeled
+    conversation. Follow-ups ("How long will it take?") lean on earlier
+    turns and say nothing about the issue type on their own.
+    """
+    examples = []
+    for name in sorted(os.listdir(interactions_dir)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(interactions_dir, name), "r", encoding="utf-8") as f:
+            conversations = json.load(f)
+        for conv in conversations:
+            issue_type = (conv.get("expected_outcome") or {}).get("issue_type")
+            if not issue_type:
+                continue
+            for turn in conv.get("turns") or ():
+                if turn.get("role") == "user" and turn.get("message"):
+                    examples.append((turn["message"], issue_type))
+                    break
+    return examples
+
+
+class SimilarityClassifier:
+    """
+    Nearest-centroid TF-IDF classifier. scores() returns the issue types
+    whose cosine similarity to the ticket reaches min_score, best first;
+    those similarities are the scores.
+    """
+
+    def __init__(self, examples: Iterable[Tuple[str, str]], min_score: float = 0.25, max_chars: int = 1000):
+        self.min_score = min_score
+        self.max_chars = max_chars
+
+        docs = [(features(text, max_chars), label) for text, label in examples]
+        self.labels: List[str] = sorted({label for _, label in docs})
+        n = len(docs)
+        df: Dict[int, int] = {}
+        for vec, _ in docs:
+            for h in vec:
+                df[h] = df.get(h, 0) + 1
+        # smoothed idf; features never seen in training get the largest weight
+        self._idf = {h: math.log((1 + n) / (1 + d)) + 1.0 for h, d in df.items()}
+        self._unseen_idf = math.log(1 + n) + 1.0
+
+        label_idx = {label: i for i, label in enumerate(self.labels)}
+        centroids: List[Dict[int, float]] = [{} for _ in self.labels]
+        for vec, label in docs:
+            centroid = centroids[label_idx[label]]
+            for h, v in _normalized({h: tf * self._idf[h] for h, tf in vec.items()}).items():
+                centroid[h] = centroid.get(h, 0.0) + v
+
+        # column storage of the label x feature centroid matrix
+        self._columns: Dict[int, Tuple[array, array]] = {}
+        for i, centroid in enumerate(centroids):
+            for h, v in _normalized(centroid).items():
+                rows, values = self._columns.setdefault(h, (array("i"), array("d")))
+                rows.append(i)
+                values.append(v)
+
+    @classmethod
+    def from_interactions(cls, interactions_dir: str, **kwargs: Any) -> "SimilarityClassifier":
+        return cls(interaction_examples(interactions_dir), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def scores(
+        self,
+        text: str,
+        memo: Optional[Dict[str, Tuple[int, ...]]] = None,
+        deadline: Optional[float] = None,
+    ) -> Optional[List[LabelScore]]:
+        """
+        Matching issue types, best first. With a time.perf_counter()
+        deadline, None once it passes: the ticket is given up on between
+        words / features, so the overrun is at most one word's hashing.
+        """
+        tf = features(text, self.max_chars, memo, deadline)
+        if tf is None:
+            return None
+        idf, unseen, columns = self._idf, self._unseen_idf, self._columns
+        dots = [0.0] * len(self.labels)
+        norm = 0.0
+        for h, v in tf.items():
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            w = v * idf.get(h, unseen)
+            norm += w * w
+            column = columns.get(h)
+            if column is not None:
+                for row, value in zip(*column):
+                    dots[row] += w * value
+        if not norm:
+            return []
+        norm = math.sqrt(norm)
+        ranked = [
+            LabelScore(self.labels[i], round(dot / norm, 4), ())
+            for i, dot in enumerate(dots)
+            if dot / norm >= self.min_score
+        ]
+        ranked.sort(key=lambda s: -s.score)
+        return ranked
+
+    def scores_many(self, texts: Sequence[str], budget: Optional[float] = None) -> List[List[LabelScore]]:
+        """
+        scores() for a batch, each ticket within a latency budget of
+        `budget` seconds of its own: a ticket whose scoring runs over is
+        abandoned and left unscored ([]), i.e. stays unknown, without
+        eating into the next ticket's budget. Word hashes are shared
+        across the batch, so only its distinct words are hashed.
+        """
+        memo: Dict[str, Tuple[int, ...]] = {}
+        results: List[List[LabelScore]] = []
+        for text in texts:
+            deadline = time.perf_counter() + budget if budget is not None else None
+            ranked = self.scores(text, memo, deadline)
+            if ranked is None:
+                CLASSIFY_FALLBACK.inc("skipped")
+                results.append([])
+                continue
+            CLASSIFY_FALLBACK.inc("hit" if ranked else "miss")
+            results.append(ranked)
+        return results
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Request coalescing: while a call for a key is in flight, other callers
+    asking for the same key wait for it and share its result (or error)
+    instead of issuing their own.
+
+    ado() is for coroutines on an event loop, do() for threads (e.g. the
+    graph.batch worker threads). `shared` counts callers that piggybacked.
+    """
+
+    def __init__(self, on_shared: Optional[Callable[[], None]] = None):
+        self.shared = 0
+        self._on_shared = on_shared
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def _piggyback(self) -> None:
+        self.shared += 1
+        if self._on_shared:
+            self._on_shared()
+
+    async def ado(self, key: Hashable, fn: Callable[[Hashable], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not loop:
+            # run the call as its own task so one waiter being cancelled
+            # doesn't cancel it for everybody else
+            task = loop.create_task(fn(key))
+            self._tasks[key] = task
+            task.add_done_callback(lambda t, key=key: self._finish(key, t))
+        else:
+            self._piggyback()
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def do(self, key: Hashable, fn: Callable[[Hashable], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._piggyback()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(key)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,61 @@
+import re
+from typing import Any, Dict, Iterable, List
+
+DEFAULT_TEMPLATE = "Hi {{customer_name}}, we are reviewing order {{order_id}}."
+
+# values used when the order lacks a field (kept from the old str.replace chain)
+FIELD_DEFAULTS = {"customer_name": "Customer", "order_id": ""}
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def _format_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        # e.g. order["items"] -> "Wireless Mouse, USB Cable"
+        return ", ".join(v["name"] if isinstance(v, dict) and "name" in v else str(v) for v in value)
+    return str(value)
+
+
+class CompiledTemplate:
+    """
+    A reply template parsed once into literal and placeholder segments.
+    re.split leaves literals at even indexes and field names at odd ones,
+    so rendering fills the odd slots and does a single join.
+    """
+
+    __slots__ = ("source", "_parts")
+
+    def __init__(self, source: str):
+        self.source = source
+        self._parts: List[str] = _PLACEHOLDER.split(source)
+
+    @property
+    def fields(self) -> List[str]:
+        return self._parts[1::2]
+
+    def render(self, order: Dict[str, Any]) -> str:
+        parts = self._parts[:]
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            parts[i] = _format_value(order.get(name, FIELD_DEFAULTS.get(name, "")))
+        return "".join(parts)
+
+
+class ReplyTemplates:
+    """Compiled reply templates from replies.json, keyed by issue_type."""
+
+    def __init__(self, replies: Iterable[Dict[str, Any]], default: str = DEFAULT_TEMPLATE):
+        self.default = CompiledTemplate(default)
+        self._by_issue: Dict[str, CompiledTemplate] = {}
+        for r in replies:
+            # first entry per issue_type wins; an empty template falls back to the default
+            if r["issue_type"] not in self._by_issue:
+                self._by_issue[r["issue_type"]] = CompiledTemplate(r["template"]) if r["template"] else self.default
+
+    def get(self, issue_type: str) -> CompiledTemplate:
+        return self._by_issue.get(issue_type, self.default)
+
+    def render(self, issue_type: str, order: Dict[str, Any]) -> str:
+        return self.get(issue_type).render(order)
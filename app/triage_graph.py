@@ -0,0 +1,374 @@
+"""
+LangGraph triage workflow: state, order tool, nodes and the compiled graph.
+
+Kept out of app.main so importing the API (and serving /health, /orders/*)
+doesn't pay for the LangGraph / langchain_core imports or graph compile;
+app.main.get_graph() imports this module on first use.
+"""
+
+import json, os
+from typing import Annotated, Optional, TypedDict, List, Dict, Any
+
+# --- LangGraph / LangChain imports ---
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages, AnyMessage
+from langgraph.prebuilt import ToolNode
+from langgraph.types import Send
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.tools import StructuredTool
+
+from app import main
+from app.metrics import ISSUE_TYPES, NODE_DURATION
+
+# ---------- LangGraph: State, tools, and nodes ----------
+
+
+def _append(left: Optional[list], right: Optional[list]) -> list:
+    return (left or []) + (right or [])
+
+
+class TriageState(TypedDict):
+    # required by assignment
+    messages: Annotated[List[AnyMessage], add_messages]
+    ticket_text: str
+    order_id: Optional[str]
+    issue_type: Optional[str]
+    evidence: Optional[str]
+    recommendation: Optional[str]
+
+    # score of issue_type, whether it needs a human, the stage that decided
+    # it and every matching issue_type ranked (see main.classification)
+    confidence: Optional[float]
+    needs_review: Optional[bool]
+    source: Optional[str]
+    labels: Optional[List[Dict[str, Any]]]
+
+    # internal convenience fields
+    order: Optional[Dict[str, Any]]
+    # every known order ID found in ticket_text, in order of appearance
+    order_ids: Optional[List[str]]
+    # multi-order tickets: one entry per order_ids entry, appended by the
+    # parallel fetch_order_item branches, and one drafted reply per order
+    orders: Annotated[List[Dict[str, Any]], _append]
+    replies: Optional[List[Dict[str, Any]]]
+
+
+# --- Tool for fetching orders (used by ToolNode) ---
+
+
+def fetch_order(order_id: str) -> Dict[str, Any]:
+    """Look up an order in the mock database."""
+    o = main.ORDER_CACHE.lookup(order_id, main.DATA.order_store.get)
+    if o:
+        return o
+    # Raise ValueError so FastAPI can surface a clean 404 later
+    raise ValueError(f"Order {order_id} not found")
+
+
+async def afetch_order(order_id: str) -> Dict[str, Any]:
+    """Async variant of fetch_order, served by the pluggable main.order_backend."""
+    o = await main.ORDER_CACHE.alookup(order_id, main.order_backend.get)
+    if o:
+        return o
+    raise ValueError(f"Order {order_id} not found")
+
+
+# sync + async implementations, so ToolNode.ainvoke never falls back to a thread
+fetch_order_tool = StructuredTool.from_function(
+    func=fetch_order,
+    coroutine=afetch_order,
+    name="fetch_order_tool",
+)
+
+
+tool_node = ToolNode([fetch_order_tool])
+
+# How fetch_order_node looks orders up:
+# - "direct": call the order store and put the dict on state (default, no
+#   JSON round-trip or extra messages)
+# - "tool": go through ToolNode so the tool call / ToolMessage pair is kept
+#   in messages and shows up in traces
+# A single run can override it with config={"configurable": {"fetch_order_mode": ...}}.
+FETCH_ORDER_MODE = os.getenv("TRIAGE_FETCH_ORDER_MODE", "direct")
+
+
+# --- Graph nodes ---
+
+
+def ingest_node(state: TriageState) -> Dict[str, Any]:
+    """
+    Ingest the incoming ticket text into the messages list.
+    """
+    ticket_text = state["ticket_text"]
+    return {"messages": [HumanMessage(content=ticket_text)]}
+
+
+def classify_issue_node(state: TriageState) -> Dict[str, Any]:
+    """
+    Classify the issue using weighted keyword rules (from issues.json),
+    all matched in one pass by the shared main.DATA.classifier automaton,
+    falling back to similarity with labeled examples when none matches.
+    """
+    classifier = main.DATA.classifier  # one snapshot: ranked[0].rules index its rules
+    (ranked,) = main.rank_issue_types([state["ticket_text"]], classifier)
+    result = main.classification(ranked)
+    issue_type = result["issue_type"]
+    evidence = "no matching keyword found"
+    if ranked and not ranked[0].rules:
+        evidence = f"no matching keyword; similar to labeled examples (score {ranked[0].score})"
+    elif ranked:
+        keywords = ", ".join(f"'{classifier.rules[idx]['keyword']}'" for idx in ranked[0].rules)
+        evidence = f"matched keyword {keywords}" if len(ranked[0].rules) == 1 else f"matched keywords {keywords}"
+    ISSUE_TYPES.inc(issue_type)
+
+    # we also append an AI message describing classification
+    explanation = f"Detected issue_type='{issue_type}' ({evidence})."
+    return {
+        "issue_type": issue_type,
+        "confidence": result["confidence"],
+        "needs_review": result["needs_review"],
+        "source": result["source"],
+        "labels": result["labels"],
+        "evidence": evidence,
+        "messages": [AIMessage(content=explanation)],
+    }
+
+
+def _pick_order_id(candidates: List[str], known: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    order_ids = [c for c in candidates if c in known]
+    for order_id in order_ids:
+        main.ORDER_CACHE.put(order_id, known[order_id])  # fetch_order won't need to look it up again
+    # with no known ID keep the first candidate, so fetch_order reports a 404
+    order_id = order_ids[0] if order_ids else (candidates[0] if candidates else None)
+    return {"order_id": order_id, "order_ids": order_ids}
+
+
+def extract_order_id_node(state: TriageState) -> Dict[str, Any]:
+    """
+    Extract order_id from either the provided field or the ticket text.
+    This implements the 'control flow: extract order_id if missing'.
+
+    All candidate IDs (every configured format, one scan) are validated
+    against the order store in one call; the first known one wins.
+    """
+    order_id = state.get("order_id")
+    if order_id:
+        return {"order_id": order_id}
+    candidates = main.ORDER_ID_EXTRACTOR.order_ids(state["ticket_text"])
+    known = main.DATA.order_store.get_many(candidates) if candidates else {}
+    return _pick_order_id(candidates, known)
+
+
+def _required_order_id(state: TriageState) -> str:
+    order_id = state.get("order_id")
+    if not order_id:
+        # let FastAPI transform this into a 400 later
+        raise ValueError("order_id missing and not found in text")
+    return order_id
+
+
+def _use_tool_node(config: Optional[RunnableConfig]) -> bool:
+    configurable = (config or {}).get("configurable") or {}
+    return configurable.get("fetch_order_mode", FETCH_ORDER_MODE) == "tool"
+
+
+def _fetch_order_call(order_id: str) -> AIMessage:
+    # Create an AIMessage with a tool call
+    tool_calls = [
+        {
+            "name": "fetch_order_tool",
+            "args": {"order_id": order_id},
+            "id": f"fetch_order_tool-{order_id}",
+        }
+    ]
+    return AIMessage(content="", tool_calls=tool_calls)
+
+
+def _fetch_order_result(ai_msg: AIMessage, result_state: Dict[str, Any]) -> Dict[str, Any]:
+    tool_messages = result_state["messages"]
+    last_msg = tool_messages[-1] if tool_messages else None
+
+    # ToolNode returns a ToolMessage as the last message
+    if isinstance(last_msg, ToolMessage):
+        content = last_msg.content
+        if isinstance(content, str):
+            try:
+                order = json.loads(content)
+            except Exception:
+                order = {"raw": content}
+        else:
+            order = content
+    else:
+        order = None
+
+    # emit only the new tool-call / tool-result messages; add_messages appends
+    # them, so reducer work stays constant however long the history gets
+    return {"messages": [ai_msg, *tool_messages], "order": order}
+
+
+def fetch_order_node(state: TriageState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """
+    Fetch the order and attach it to state, either straight from the order
+    store or (in "tool" mode) via ToolNode calling fetch_order_tool.
+    """
+    order_id = _required_order_id(state)
+    if not _use_tool_node(config):
+        return {"order": fetch_order(order_id)}
+
+    ai_msg = _fetch_order_call(order_id)
+    # ToolNode only reads the last AIMessage, so don't hand it the history
+    result_state = tool_node.invoke({"messages": [ai_msg]})
+    return _fetch_order_result(ai_msg, result_state)
+
+
+async def afetch_order_node(state: TriageState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """
+    Async fetch_order_node: awaits the lookup so order I/O doesn't block.
+    """
+    order_id = _required_order_id(state)
+    if not _use_tool_node(config):
+        return {"order": await afetch_order(order_id)}
+
+    ai_msg = _fetch_order_call(order_id)
+    result_state = await tool_node.ainvoke({"messages": [ai_msg]})
+    return _fetch_order_result(ai_msg, result_state)
+
+
+def _as_item(update: Dict[str, Any]) -> Dict[str, Any]:
+    # a fan-out branch must not write the single-order `order` channel
+    item = {"orders": [update["order"]]}
+    if "messages" in update:
+        item["messages"] = update["messages"]
+    return item
+
+
+def fetch_order_item_node(state: TriageState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """
+    One branch of a multi-order fan-out (see route_after_extract): fetch
+    state["order_id"] like fetch_order_node, appended to `orders`.
+    """
+    return _as_item(fetch_order_node(state, config))
+
+
+async def afetch_order_item_node(state: TriageState, config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    return _as_item(await afetch_order_node(state, config))
+
+
+def draft_reply_node(state: TriageState) -> Dict[str, Any]:
+    """
+    Draft a reply using the issue_type and order (mock template-based).
+    A multi-order ticket gets one reply per order, joined into recommendation.
+    """
+    issue_type = state.get("issue_type") or "unknown"
+    orders = state.get("orders")
+    if not orders:
+        order = state.get("order") or {}
+        reply_text = main.render_reply(issue_type, order)
+        return {
+            "messages": [AIMessage(content=reply_text)],
+            "recommendation": reply_text,
+        }
+
+    # branches finish in any order; answer in the order the ticket names them
+    rank = {order_id: i for i, order_id in enumerate(state.get("order_ids") or ())}
+    orders = sorted(orders, key=lambda o: rank.get(o.get("order_id"), len(rank)))
+    replies = [{"order_id": o.get("order_id"), "reply_text": main.render_reply(issue_type, o)} for o in orders]
+    reply_text = "\n\n".join(r["reply_text"] for r in replies)
+    return {
+        "messages": [AIMessage(content=reply_text)],
+        "recommendation": reply_text,
+        "order": orders[0],
+        "replies": replies,
+    }
+
+
+# Async twins of the CPU-only nodes, so graph.ainvoke stays on the event loop
+async def aingest_node(state: TriageState) -> Dict[str, Any]:
+    return ingest_node(state)
+
+
+async def aclassify_issue_node(state: TriageState) -> Dict[str, Any]:
+    return classify_issue_node(state)
+
+
+async def aextract_order_id_node(state: TriageState) -> Dict[str, Any]:
+    order_id = state.get("order_id")
+    if order_id:
+        return {"order_id": order_id}
+    candidates = main.ORDER_ID_EXTRACTOR.order_ids(state["ticket_text"])
+    known = await main.order_backend.get_many(candidates) if candidates else {}
+    return _pick_order_id(candidates, known)
+
+
+async def adraft_reply_node(state: TriageState) -> Dict[str, Any]:
+    return draft_reply_node(state)
+
+
+# --- Graph wiring ---
+
+
+def route_after_classify(state: TriageState) -> str:
+    """
+    Conditional edge:
+    - If we already have an order_id (provided or previously extracted),
+      go directly to fetch_order.
+    - Otherwise, go to extract_order_id first.
+    """
+    if state.get("order_id"):
+        return "fetch_order"
+    return "extract_order_id"
+
+
+def route_after_extract(state: TriageState):
+    """
+    Conditional edge: a ticket naming several known orders fans out into
+    one fetch_order_item branch per order (run concurrently, joined before
+    draft_reply); otherwise the single order goes through fetch_order.
+    """
+    order_ids = state.get("order_ids") or []
+    if len(order_ids) > 1:
+        return [Send("fetch_order_item", {**state, "order_id": order_id}) for order_id in order_ids]
+    return "fetch_order"
+
+
+graph_builder = StateGraph(TriageState)
+
+
+def _node(name: str, func, afunc) -> RunnableLambda:
+    """
+    Each node carries a sync and an async implementation (graph.invoke runs
+    the former, graph.ainvoke / graph.abatch await the latter), both timed
+    into triage_node_duration_seconds{node=name}.
+    """
+    timer = NODE_DURATION.time(name)
+    return RunnableLambda(timer(func), afunc=timer(afunc), name=name)
+
+
+graph_builder.add_node("ingest", _node("ingest", ingest_node, aingest_node))
+graph_builder.add_node("classify_issue", _node("classify_issue", classify_issue_node, aclassify_issue_node))
+graph_builder.add_node("extract_order_id", _node("extract_order_id", extract_order_id_node, aextract_order_id_node))
+graph_builder.add_node("fetch_order", _node("fetch_order", fetch_order_node, afetch_order_node))
+graph_builder.add_node("fetch_order_item", _node("fetch_order_item", fetch_order_item_node, afetch_order_item_node))
+graph_builder.add_node("draft_reply", _node("draft_reply", draft_reply_node, adraft_reply_node))
+
+graph_builder.add_edge(START, "ingest")
+graph_builder.add_edge("ingest", "classify_issue")
+
+graph_builder.add_conditional_edges(
+    "classify_issue",
+    route_after_classify,
+    {
+        "fetch_order": "fetch_order",
+        "extract_order_id": "extract_order_id",
+    },
+)
+
+graph_builder.add_conditional_edges("extract_order_id", route_after_extract, ["fetch_order", "fetch_order_item"])
+graph_builder.add_edge("fetch_order", "draft_reply")
+graph_builder.add_edge("fetch_order_item", "draft_reply")
+graph_builder.add_edge("draft_reply", END)
+
+graph = graph_builder.compile()
+# If you set LANGCHAIN_TRACING_V2 + LANGCHAIN_API_KEY env vars,
+# this graph will automatically send traces to LangSmith.
@@ -0,0 +1,298 @@
+"""
+Latency benchmarks for the triage graph nodes, whole graph runs and every
+FastAPI route, plus scaling runs over synthetic catalogs / rule sets.
+
+    python -m benchmarks.bench_triage -o bench.json
+    python -m benchmarks.bench_triage --sizes 10,1000,100000,1000000 -o big.json
+    python -m benchmarks.bench_triage --compare bench.json   # diff against a previous run
+
+Results are JSON (one entry per case, sorted, with p50/p95/p99 in
+microseconds) so two runs can be diffed directly.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.testclient import TestClient
+from langgraph.graph import END, START, StateGraph
+
+from app import main, triage_graph
+from app.mock_data import MockData
+
+DEFAULT_SIZES = [10, 1000, 100_000]
+
+TICKET = "My Bluetooth speaker (ORD1002) has not arrived yet."
+
+
+def measure(fn: Callable[[], Any], iterations: int, warmup: int = 20) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t0)
+    samples.sort()
+
+    def pct(p: float) -> float:
+        return round(samples[min(len(samples) - 1, int(p * len(samples)))] / 1000, 2)
+
+    return {
+        "n": iterations,
+        "p50_us": pct(0.50),
+        "p95_us": pct(0.95),
+        "p99_us": pct(0.99),
+        "mean_us": round(sum(samples) / len(samples) / 1000, 2),
+    }
+
+
+# --- synthetic data ---
+
+
+def synthetic_orders(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "order_id": f"SYN{i:07d}",
+            "customer_name": f"Customer {i}",
+            "email": f"customer{i}@example.com",
+            "items": [{"sku": f"SKU-{i % 997}", "name": f"Item {i % 997}", "quantity": 1}],
+            "order_date": "2025-01-01",
+            "status": "shipped",
+            "delivery_date": "2025-01-05",
+            "total_amount": 10.0,
+            "currency": "USD",
+        }
+        for i in range(n)
+    ]
+
+
+def synthetic_issues(n: int) -> List[Dict[str, Any]]:
+    # distinct multi-character keywords that never occur in normal ticket text
+    return [{"keyword": f"zq{i:x}q", "issue_type": f"synthetic_{i % 50}"} for i in range(n)]
+
+
+def synthetic_data(size: int) -> MockData:
+    base = MockData.load(main.MOCK_DIR)
+    return MockData(
+        orders=synthetic_orders(size),
+        issues=synthetic_issues(size) + base.issues,
+        replies=base.replies,
+    )
+
+
+# --- cases ---
+
+
+def _state(**overrides) -> Dict[str, Any]:
+    state = main._initial_state(main.TriageInput(ticket_text=TICKET))
+    state.update(overrides)
+    return state
+
+
+def node_cases(iterations: int) -> List[Dict[str, Any]]:
+    ingested = _state(**triage_graph.ingest_node(_state()))
+    classified = dict(ingested, **{k: v for k, v in triage_graph.classify_issue_node(ingested).items() if k != "messages"})
+    extracted = dict(classified, **triage_graph.extract_order_id_node(classified))
+    fetched = dict(extracted, **{k: v for k, v in triage_graph.fetch_order_node(extracted).items() if k != "messages"})
+
+    builder = StateGraph(triage_graph.TriageState)
+    builder.add_node("fetch_order", triage_graph.fetch_order_node)
+    builder.add_edge(START, "fetch_order")
+    builder.add_edge("fetch_order", END)
+    fetch_only = builder.compile()
+
+    cases = {
+        "node/ingest": lambda: triage_graph.ingest_node(_state()),
+        "node/classify_issue": lambda: triage_graph.classify_issue_node(ingested),
+        "node/extract_order_id": lambda: triage_graph.extract_order_id_node(classified),
+        "node/fetch_order": lambda: triage_graph.fetch_order_node(extracted),
+        # ToolNode needs the graph runtime, so this one includes a one-node graph run
+        "node/fetch_order[tool]": lambda: fetch_only.invoke(
+            extracted, config={"configurable": {"fetch_order_mode": "tool"}}
+        ),
+        "node/draft_reply": lambda: triage_graph.draft_reply_node(fetched),
+        "graph/invoke": lambda: main.get_graph().invoke(_state()),
+    }
+    return [dict(name=name, size=None, **measure(fn, iterations)) for name, fn in cases.items()]
+
+
+def route_cases(iterations: int) -> List[Dict[str, Any]]:
+    client = TestClient(main.app)
+    batch = [{"ticket_text": TICKET}] * 10
+    texts = synthetic_tickets(1000)
+    ndjson = "\n".join(json.dumps(b) for b in batch)
+
+    cases = {
+        "route/GET /health": lambda: client.get("/health"),
+        "route/GET /orders/get": lambda: client.get("/orders/get", params={"order_id": "ORD1002"}),
+        "route/GET /orders/search[email]": lambda: client.get(
+            "/orders/search", params={"customer_email": "david.lee@example.com"}
+        ),
+        "route/GET /orders/search[q]": lambda: client.get("/orders/search", params={"q": "David Lee"}),
+        "route/POST /classify/issue": lambda: client.post("/classify/issue", json={"ticket_text": TICKET}),
+        "route/POST /classify/batch[1000]": lambda: client.post("/classify/batch", json={"ticket_texts": texts}),
+        "route/POST /reply/draft": lambda: client.post(
+            "/reply/draft", json={"issue_type": "late_delivery", "order": {"order_id": "ORD1002"}}
+        ),
+        "route/POST /triage/invoke": lambda: client.post("/triage/invoke", json={"ticket_text": TICKET}),
+        "route/POST /triage/invoke[no messages]": lambda: client.post(
+            "/triage/invoke", json={"ticket_text": TICKET}, params={"include_messages": "false"}
+        ),
+        "route/POST /triage/batch[10]": lambda: client.post("/triage/batch", json=batch),
+        "route/POST /triage/stream[10]": lambda: client.post("/triage/stream", content=ndjson),
+    }
+    return [dict(name=name, size=None, **measure(fn, iterations)) for name, fn in cases.items()]
+
+
+def scaling_cases(sizes: List[int], iterations: int) -> List[Dict[str, Any]]:
+    results = []
+    original = main.DATA
+    try:
+        for size in sizes:
+            t0 = time.perf_counter()
+            data = synthetic_data(size)
+            build_s = time.perf_counter() - t0
+            main._swap_data(data)
+
+            probe = f"SYN{size // 2:07d}"
+            text = f"please look at {probe}, it is zq{size - 1:x}q " + "and more words " * 20
+            cases = {
+                "scale/build_indexes": None,
+                "scale/order_store.get": lambda: main.DATA.order_store.get(probe),
+                "scale/order_store.search[email]": lambda: main.DATA.order_store.search(
+                    customer_email=f"customer{size // 2}@example.com"
+                ),
+                "scale/order_store.search[q]": lambda: main.DATA.order_store.search(q=f"customer {size // 2}"),
+                "scale/order_store.search[prefix]": lambda: main.DATA.order_store.search(q="SYN00", limit=50),
+                "scale/classifier.scores": lambda: main.DATA.classifier.scores(text),
+                "scale/graph.invoke": lambda: main.get_graph().invoke(_state(ticket_text=text, order_id=probe)),
+            }
+            for name, fn in cases.items():
+                if fn is None:
+                    results.append({"name": name, "size": size, "n": 1, "seconds": round(build_s, 3)})
+                else:
+                    results.append(dict(name=name, size=size, **measure(fn, iterations)))
+    finally:
+        main._swap_data(original)
+    return results
+
+
+def synthetic_tickets(n: int) -> List[str]:
+    # mostly real-looking tickets, a few matching nothing
+    samples = [
+        "I'd like a refund for order ORD1001.",
+        "My Bluetooth speaker (ORD1002) has not arrived yet, it is very LATE.",
+        "The smart watch I got (ORD1004) is not working.",
+        "Wrong item shipped for order ORD1006.",
+        "one sleeve is missing for ORD1005",
+        "Hello, just a question about my account settings " + "please " * 20,
+    ]
+    return [f"{samples[i % len(samples)]} (#{i})" for i in range(n)]
+
+
+def classify_cases(sizes: List[int]) -> List[Dict[str, Any]]:
+    """
+    Bulk classification: the per-ticket loop (classify_issue per text, as a
+    reclassification job did) against classify_texts on the same batch,
+    with tickets/s and the speedup of the batch path.
+    """
+    results = []
+    for size in sizes:
+        texts = synthetic_tickets(size)
+        iterations = max(3, min(200, 20_000 // size))
+        loop = measure(lambda: [main.classify_issue({"ticket_text": t}) for t in texts], iterations, warmup=2)
+        batch = measure(lambda: main.classify_texts(texts), iterations, warmup=2)
+        for name, r in (("classify/per_ticket", loop), ("classify/batch", batch)):
+            r["tickets_per_s"] = round(size / (r["p50_us"] / 1e6)) if r["p50_us"] else None
+            results.append(dict(name=name, size=size, **r))
+        results[-1]["speedup"] = round(loop["p50_us"] / batch["p50_us"], 2) if batch["p50_us"] else None
+    return results
+
+
+_STARTUP_SNIPPETS = {
+    # non-graph routes only need app.main; the graph is compiled on first triage
+    "startup/import app.main": "import app.main",
+    "startup/import app.main + get_graph": "import app.main; app.main.get_graph()",
+}
+
+
+def startup_cases(runs: int = 5) -> List[Dict[str, Any]]:
+    """Cold-start cost, each run in a fresh interpreter."""
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    results = []
+    for name, snippet in _STARTUP_SNIPPETS.items():
+        code = f"import time; t0 = time.perf_counter(); {snippet}; print(time.perf_counter() - t0)"
+        samples = sorted(
+            float(subprocess.run([sys.executable, "-c", code], cwd=root, check=True, capture_output=True, text=True).stdout)
+            for _ in range(runs)
+        )
+        results.append({
+            "name": name,
+            "size": None,
+            "n": runs,
+            "p50_us": round(samples[len(samples) // 2] * 1e6, 2),
+            "p95_us": round(samples[-1] * 1e6, 2),
+            "p99_us": round(samples[-1] * 1e6, 2),
+            "mean_us": round(sum(samples) / runs * 1e6, 2),
+        })
+    return results
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> str:
+    def key(r):
+        return (r["name"], r["size"])
+
+    before = {key(r): r for r in old["results"]}
+    lines = [f"{'case':<45} {'size':>8} {'p50 old':>10} {'p50 new':>10} {'delta':>8}"]
+    for r in new["results"]:
+        o = before.get(key(r))
+        if not o or "p50_us" not in r or "p50_us" not in o:
+            continue
+        delta = (r["p50_us"] - o["p50_us"]) / o["p50_us"] * 100 if o["p50_us"] else 0.0
+        lines.append(f"{r['name']:<45} {str(r['size'] or ''):>8} {o['p50_us']:>10} {r['p50_us']:>10} {delta:>+7.1f}%")
+    return "\n".join(lines)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_triage")
+    parser.add_argument("-o", "--output", help="write JSON results here (default stdout)")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated synthetic sizes")
+    parser.add_argument("--compare", help="previous results JSON to diff p50s against")
+    parser.add_argument("--skip-routes", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results = node_cases(args.iterations)
+    if not args.skip_routes:
+        results += route_cases(args.iterations)
+    results += scaling_cases(sizes, args.iterations)
+    results += classify_cases(sizes)
+    results += startup_cases()
+    results.sort(key=lambda r: (r["name"], r["size"] or 0))
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "iterations": args.iterations},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print(compare(json.load(f), report), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,18 @@
+# tests/conftest.py
+
+import pytest
+
+
+class FakeClock:
+    """Stands in for time.monotonic; tests move `now` by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
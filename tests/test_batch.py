@@ -0,0 +1,32 @@
+# tests/test_batch.py
+
+import io
+import json
+
+from app.batch import read_tickets, run
+
+
+def test_read_tickets_csv():
+    f = io.StringIO("ticket_text,order_id\nrefund please,ORD1001\nwhere is ORD1002,\n")
+    assert list(read_tickets(f, "csv")) == [
+        {"ticket_text": "refund please", "order_id": "ORD1001"},
+        {"ticket_text": "where is ORD1002", "order_id": None},
+    ]
+
+
+def test_run_writes_one_line_per_ticket():
+    records = [
+        json.dumps({"ticket_text": "I'd like a refund for order ORD1001."}),
+        json.dumps({"ticket_text": "please help with my purchase"}),
+        "{not json",
+        {"ticket_text": "Wrong item shipped.", "order_id": "ORD1006"},
+    ]
+    out = io.StringIO()
+
+    assert run(records, out, workers=2, chunk_size=1, log=None) == 4
+
+    results = {item["index"]: item for item in map(json.loads, out.getvalue().splitlines())}
+    assert [results[i]["status_code"] for i in range(4)] == [200, 400, 422, 200]
+    assert all("input" not in err for err in results[2]["detail"])  # same items as /triage/stream
+    assert results[0]["result"]["issue_type"] == "refund_request"
+    assert results[3]["result"]["issue_type"] == "wrong_item"
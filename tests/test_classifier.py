@@ -0,0 +1,88 @@
+# tests/test_classifier.py
+
+import json
+import os
+
+import pytest
+
+from app.classifier import KeywordMatcher
+
+ISSUES_PATH = os.path.join(os.path.dirname(__file__), "..", "mock_data", "issues.json")
+
+
+def reference_matches(rules, text):
+    return {idx for idx, rule in enumerate(rules) if rule["keyword"] in text}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "i'd like a refund, the item arrived broken and late",
+        "the parcel has not arrived and one sleeve is missing",
+        "i was charged twice and got the wrong item",
+        "nothing relevant here",
+        "",
+    ],
+)
+def test_scores_find_every_matching_rule(text):
+    with open(ISSUES_PATH, encoding="utf-8") as f:
+        rules = json.load(f)
+    ranked = KeywordMatcher(rules).scores(text)
+    assert {idx for s in ranked for idx in s.rules} == reference_matches(rules, text)
+
+
+def test_overlapping_keywords_found_in_single_pass():
+    rules = [
+        {"keyword": "she", "issue_type": "a"},
+        {"keyword": "he", "issue_type": "b"},
+        {"keyword": "hers", "issue_type": "c"},
+    ]
+    matcher = KeywordMatcher(rules)
+    assert [s.rules for s in matcher.scores("ushers")] == [(0,), (1,), (2,)]
+
+
+def test_batch_scores_match_per_text_scores():
+    with open(ISSUES_PATH, encoding="utf-8") as f:
+        rules = json.load(f)
+    matcher = KeywordMatcher(rules)
+    texts = ["I'd like a REFUND", "Nothing relevant", "", "Wrong item\0and late, refund it", "one sleeve is MISSING"]
+
+    assert matcher.scores_many(texts) == [matcher.scores(t.lower()) for t in texts]
+    assert matcher.scores_many(["REFUND"], lowercase=False) == [[]]
+    assert matcher.scores_many([]) == []
+
+
+def test_empty_keyword_matches_every_text():
+    matcher = KeywordMatcher([{"keyword": "late", "issue_type": "a"}, {"keyword": "", "issue_type": "b"}])
+    assert [[s.issue_type for s in r] for r in matcher.scores_many(["", "late"])] == [["b"], ["a", "b"]]
+
+
+def test_scores_combine_weighted_hits_and_rank_labels():
+    rules = [
+        {"keyword": "refund", "issue_type": "refund_request", "weight": 0.9},
+        {"keyword": "late", "issue_type": "late_delivery", "weight": 0.6},
+        {"keyword": "not arrived", "issue_type": "late_delivery", "weight": 0.5},
+        {"keyword": "broken", "issue_type": "damaged_item"},
+    ]
+    matcher = KeywordMatcher(rules)
+
+    ranked = matcher.scores("it is late and has not arrived, refund please")
+    assert [(s.issue_type, s.score) for s in ranked] == [("refund_request", 0.9), ("late_delivery", 0.8)]
+    assert ranked[1].rules == (1, 2)
+
+    assert [(s.issue_type, s.score) for s in matcher.scores("broken")] == [("damaged_item", 0.85)]
+    assert matcher.scores("all good") == []
+    assert [[s.issue_type for s in r] for r in matcher.scores_many(["LATE", "Broken"])] == [
+        ["late_delivery"], ["damaged_item"],
+    ]
+
+
+def test_equal_scores_keep_rule_order():
+    rules = [{"keyword": "b", "issue_type": "second"}, {"keyword": "a", "issue_type": "first"}]
+    assert [s.issue_type for s in KeywordMatcher(rules).scores("a b")] == ["second", "first"]
+
+
+@pytest.mark.parametrize("weight", [0, 1.5, -1])
+def test_rejects_weights_outside_unit_interval(weight):
+    with pytest.raises(ValueError):
+        KeywordMatcher([{"keyword": "x", "issue_type": "y", "weight": weight}])
@@ -0,0 +1,9 @@
+# tests/test_metrics.py
+
+from app.metrics import _labels
+
+
+def test_label_values_are_escaped():
+    assert _labels(["issue_type"], ('say "hi"\\now\nthen',)) == '{issue_type="say \\"hi\\"\\\\now\\nthen"}'
+    assert _labels(["a", "b"], ("x", "y"), extra='le="0.1"') == '{a="x",b="y",le="0.1"}'
+    assert _labels([], ()) == ""
@@ -0,0 +1,50 @@
+# tests/test_mock_data.py
+
+import json
+import os
+import shutil
+
+from app.mock_data import MOCK_FILES, MockData, MockDataWatcher
+
+MOCK_DIR = os.path.join(os.path.dirname(__file__), "..", "mock_data")
+
+
+def copy_mock_data(tmp_path):
+    for name in MOCK_FILES:
+        shutil.copy(os.path.join(MOCK_DIR, name), tmp_path / name)
+    return str(tmp_path)
+
+
+def write_file(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    # make sure the change is visible even on coarse mtime filesystems
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_watcher_swaps_in_rebuilt_snapshot(tmp_path):
+    mock_dir = copy_mock_data(tmp_path)
+    snapshots = [MockData.load(mock_dir)]
+    watcher = MockDataWatcher(mock_dir, snapshots.append)
+
+    assert watcher.check() is False
+
+    write_file(tmp_path / "issues.json", json.dumps([{"keyword": "lost", "issue_type": "lost_parcel"}]))
+    assert watcher.check() is True
+
+    new = snapshots[-1]
+    assert [s.issue_type for s in new.classifier.scores("my parcel is lost")] == ["lost_parcel"]
+    assert new.versions["issues.json"] != snapshots[0].versions["issues.json"]
+    assert new.versions["orders.json"] == snapshots[0].versions["orders.json"]
+
+
+def test_watcher_keeps_snapshot_on_bad_json(tmp_path):
+    mock_dir = copy_mock_data(tmp_path)
+    snapshots = []
+    watcher = MockDataWatcher(mock_dir, snapshots.append)
+
+    write_file(tmp_path / "replies.json", '[{"issue_type": ')
+
+    assert watcher.check() is False
+    assert snapshots == []
@@ -0,0 +1,72 @@
+# tests/test_order_backends.py
+
+import asyncio
+
+import pytest
+
+from app.order_backends import AsyncSqliteBackend, OrderBackend, StoreBackend
+from app.orders import OrderStore, build_order_db
+
+ORDERS = [
+    {"order_id": f"ORD{1000 + i}", "customer_name": f"Customer {i}", "email": f"c{i % 3}@example.com"}
+    for i in range(20)
+]
+
+
+def test_store_backend_follows_current_store():
+    stores = [OrderStore(ORDERS[:1])]
+    backend = StoreBackend(lambda: stores[-1])
+    assert asyncio.run(backend.get("ORD1005")) is None
+
+    stores.append(OrderStore(ORDERS))
+    assert asyncio.run(backend.get("ORD1005"))["customer_name"] == "Customer 5"
+
+
+def test_sql_backend_shares_pooled_connections(tmp_path):
+    pytest.importorskip("aiosqlite")
+    path = str(tmp_path / "orders.db")
+    build_order_db(ORDERS, path)
+    backend = AsyncSqliteBackend(path, pool_size=2)
+
+    async def run():
+        try:
+            found = await asyncio.gather(*(backend.get(o["order_id"]) for o in ORDERS * 5))
+            by_email, _ = await backend.search(customer_email="C1@example.com")
+            by_q, _ = await backend.search(q="customer 3")
+            missing = await backend.get("ORD9999")
+            many = await backend.get_many(["ORD1002", "ORD9999", "ORD1019"])
+        finally:
+            await backend.close()
+        return found, by_email, by_q, missing, many
+
+    found, by_email, by_q, missing, many = asyncio.run(run())
+    assert [o["order_id"] for o in found] == [o["order_id"] for o in ORDERS * 5]
+    assert backend.opened <= 2
+    assert [o["order_id"] for o in by_email] == [o["order_id"] for o in ORDERS if o["email"] == "c1@example.com"]
+    assert [o["order_id"] for o in by_q] == ["ORD1003"]
+    assert missing is None
+    assert sorted(many) == ["ORD1002", "ORD1019"]
+
+
+def test_sql_backend_pool_exhaustion_times_out(tmp_path):
+    pytest.importorskip("aiosqlite")
+    path = str(tmp_path / "orders.db")
+    build_order_db(ORDERS, path)
+    backend = AsyncSqliteBackend(path, pool_size=1, acquire_timeout=0.05)
+
+    async def run():
+        async with backend.connection():
+            with pytest.raises(TimeoutError):
+                await backend.get("ORD1001")
+        await backend.close()
+
+    asyncio.run(run())
+
+
+def test_incomplete_backend_fails_at_construction():
+    class GetOnly(OrderBackend):
+        async def get(self, order_id):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
@@ -0,0 +1,119 @@
+# tests/test_order_cache.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.order_cache import OrderCache
+
+ORDERS = {"ORD1001": {"order_id": "ORD1001"}, "ORD1002": {"order_id": "ORD1002"}}
+
+
+def counting_loader(calls):
+    def load(order_id):
+        calls.append(order_id)
+        return ORDERS.get(order_id)
+
+    return load
+
+
+def test_hits_misses_and_ttl_expiry(clock):
+    calls = []
+    cache = OrderCache(maxsize=10, ttl=30, clock=clock)
+    load = counting_loader(calls)
+
+    assert cache.lookup("ORD1001", load)["order_id"] == "ORD1001"
+    assert cache.lookup("ORD1001", load)["order_id"] == "ORD1001"
+    assert calls == ["ORD1001"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    clock.now = 31
+    cache.lookup("ORD1001", load)
+    assert calls == ["ORD1001", "ORD1001"]
+
+
+def test_negative_caching_uses_shorter_ttl(clock):
+    calls = []
+    cache = OrderCache(ttl=30, negative_ttl=5, clock=clock)
+    load = counting_loader(calls)
+
+    assert cache.lookup("ORD9999", load) is None
+    assert cache.lookup("ORD9999", load) is None
+    assert calls == ["ORD9999"]
+
+    clock.now = 6
+    cache.lookup("ORD9999", load)
+    assert calls == ["ORD9999", "ORD9999"]
+
+
+def test_lru_eviction_and_invalidation():
+    calls = []
+    cache = OrderCache(maxsize=1)
+    load = counting_loader(calls)
+
+    cache.lookup("ORD1001", load)
+    cache.lookup("ORD1002", load)  # evicts ORD1001
+    cache.lookup("ORD1001", load)
+    assert calls == ["ORD1001", "ORD1002", "ORD1001"]
+
+    cache.invalidate("ORD1001")
+    cache.lookup("ORD1001", load)
+    assert calls[-1] == "ORD1001" and len(calls) == 4
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_async_lookup():
+    cache = OrderCache()
+
+    async def load(order_id):
+        return ORDERS.get(order_id)
+
+    assert asyncio.run(cache.alookup("ORD1002", load))["order_id"] == "ORD1002"
+    assert asyncio.run(cache.alookup("ORD1002", load))["order_id"] == "ORD1002"
+    assert cache.hits == 1
+
+
+def test_concurrent_async_misses_share_one_lookup():
+    cache = OrderCache()
+    calls = []
+
+    async def slow_load(order_id):
+        calls.append(order_id)
+        await asyncio.sleep(0.01)
+        return ORDERS.get(order_id)
+
+    async def burst():
+        return await asyncio.gather(*(cache.alookup("ORD1001", slow_load) for _ in range(50)))
+
+    results = asyncio.run(burst())
+    assert calls == ["ORD1001"]
+    assert all(r["order_id"] == "ORD1001" for r in results)
+    assert cache.flight.shared == 49
+
+
+def test_concurrent_thread_misses_share_one_lookup():
+    cache = OrderCache(maxsize=0)
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_load(order_id):
+        calls.append(order_id)
+        started.set()
+        release.wait(5)
+        return ORDERS.get(order_id)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        first = pool.submit(cache.lookup, "ORD1002", slow_load)
+        started.wait(5)
+        rest = [pool.submit(cache.lookup, "ORD1002", slow_load) for _ in range(7)]
+        while cache.flight.shared < 7:
+            time.sleep(0.001)
+        release.set()
+        results = [first.result()] + [f.result() for f in rest]
+
+    assert calls == ["ORD1002"]
+    assert all(r["order_id"] == "ORD1002" for r in results)
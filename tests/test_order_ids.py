@@ -0,0 +1,44 @@
+# tests/test_order_ids.py
+
+import pytest
+
+from app.order_ids import OrderIdExtractor
+from app.orders import OrderStore
+
+
+def test_default_pattern_finds_every_id_with_positions():
+    text = "Got ord-1002 instead of (ORD1003); ORD 1002 again"
+    extractor = OrderIdExtractor()
+    assert [(m.order_id, m.start, m.end) for m in extractor.extract(text)] == [
+        ("ORD1002", 4, 12),
+        ("ORD1003", 25, 32),
+        ("ORD1002", 35, 43),
+    ]
+    assert extractor.order_ids(text) == ["ORD1002", "ORD1003"]
+    assert extractor.order_ids("no id here") == []
+
+
+def test_multiple_formats_in_one_scan():
+    extractor = OrderIdExtractor([
+        r"ORD\d{4}",
+        [r"order (?:no\.?|number) ?(\d{4})", "ORD{1}"],
+        r"SYN\d{7}",
+    ])
+    matches = extractor.extract("Order no. 1004 / SYN0000042 / ord1001")
+    assert [(m.order_id, m.pattern) for m in matches] == [("ORD1004", 1), ("SYN0000042", 2), ("ORD1001", 0)]
+
+
+def test_format_keeps_separators_in_canonical_ids():
+    extractor = OrderIdExtractor([r"ORD[-_ ]?\d{4}", [r"SHP[-_ ]?(\d{4})[-_ ]?(\d{4})", "SHP-{1}-{2}"]])
+    ids = extractor.order_ids("Shipment shp 2024 0001 and SHP-2024-0002 for ord-1001")
+    assert ids == ["SHP-2024-0001", "SHP-2024-0002", "ORD1001"]
+
+    store = OrderStore([{"order_id": "SHP-2024-0001", "customer_name": "Ada", "email": "ada@example.com", "items": []}])
+    assert list(store.get_many(ids)) == ["SHP-2024-0001"]
+
+
+def test_rejects_bad_patterns():
+    with pytest.raises(ValueError):
+        OrderIdExtractor([])
+    with pytest.raises(ValueError):
+        OrderIdExtractor([r"ORD(?P<num>\d{4})"])
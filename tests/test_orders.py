@@ -0,0 +1,72 @@
+# tests/test_orders.py
+
+import pytest
+
+from app.orders import OrderStore, SqliteOrderStore, build_order_db
+
+ORDERS = [
+    {"order_id": "ORD1001", "customer_name": "Ava Chen", "email": "Ava.Chen@example.com"},
+    {"order_id": "ORD1002", "customer_name": "David Lee", "email": "david.lee@example.com"},
+    {"order_id": "ORD1003", "customer_name": "Ava Chen", "email": "ava.chen@example.com"},
+]
+
+
+def test_get_by_order_id():
+    store = OrderStore(ORDERS)
+    assert store.get("ORD1002")["customer_name"] == "David Lee"
+    assert store.get("ORD9999") is None
+
+
+def ids(page):
+    results, _ = page
+    return [o["order_id"] for o in results]
+
+
+def test_email_index_is_case_insensitive():
+    store = OrderStore(ORDERS)
+    assert ids(store.search(customer_email="AVA.CHEN@EXAMPLE.COM")) == ["ORD1001", "ORD1003"]
+
+
+def test_search_tokens_and_id_prefix():
+    store = OrderStore(ORDERS)
+    assert ids(store.search(q="ORD100")) == ["ORD1001", "ORD1002", "ORD1003"]
+    assert ids(store.search(q="ord1002")) == ["ORD1002"]
+    assert ids(store.search(q="Chen ord1003")) == ["ORD1003"]
+    assert ids(store.search(q="ava lee")) == []
+    assert ids(store.search(customer_email="david.lee@example.com", q="ava chen")) == ["ORD1001", "ORD1002", "ORD1003"]
+    assert ids(store.search()) == []
+
+
+def test_search_pages_with_cursor():
+    orders = [{"order_id": f"ORD{2000 - i}", "customer_name": "Pat Kim", "email": "pat@example.com"} for i in range(7)]
+    store = OrderStore(orders)
+    seen, cursor = [], None
+    while True:
+        results, cursor = store.search(q="pat", limit=3, cursor=cursor)
+        seen.append([o["order_id"] for o in results])
+        if cursor is None:
+            break
+    assert seen == [["ORD1994", "ORD1995", "ORD1996"], ["ORD1997", "ORD1998", "ORD1999"], ["ORD2000"]]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return OrderStore(ORDERS)
+    path = str(tmp_path / "orders.db")
+    build_order_db(ORDERS, path)
+    return SqliteOrderStore(path)
+
+
+def test_backends_agree(store):
+    assert len(store) == 3
+    assert [o["order_id"] for o in store] == ["ORD1001", "ORD1002", "ORD1003"]
+    assert store.get("ORD1003") == ORDERS[2]
+    assert store.get("ORD9999") is None
+    assert store.get_many(["ORD9999", "ORD1003", "ORD1001", "ORD1003"]) == {"ORD1001": ORDERS[0], "ORD1003": ORDERS[2]}
+    assert ids(store.search(customer_email="ava.chen@EXAMPLE.com")) == ["ORD1001", "ORD1003"]
+    assert ids(store.search(q="ord1002")) == ["ORD1002"]
+    assert ids(store.search(q="ORD100 chen")) == ["ORD1001", "ORD1003"]
+    assert ids(store.search(customer_email="david.lee@example.com", q="ava chen")) == ["ORD1001", "ORD1002", "ORD1003"]
+    assert store.search(q="ord", limit=2) == ([ORDERS[0], ORDERS[1]], "ORD1002")
+    assert store.search(q="ord", limit=2, cursor="ORD1002") == ([ORDERS[2]], None)
@@ -0,0 +1,38 @@
+# tests/test_response_cache.py
+
+from app.response_cache import ResponseCache, triage_key
+
+VERSIONS = {"issues.json": "a1", "replies.json": "b1", "orders.json": "c1"}
+
+
+def test_key_covers_input_and_mock_data_versions():
+    key = triage_key("where is ORD1001", None, VERSIONS)
+    assert key == triage_key("where is ORD1001", None, dict(VERSIONS))
+    assert key != triage_key("where is ORD1001", "ORD1001", VERSIONS)
+    assert key != triage_key("where is ORD1002", None, VERSIONS)
+    assert key != triage_key("where is ORD1001", None, dict(VERSIONS, **{"issues.json": "a2"}))
+    assert key != triage_key("where is ORD1001", None, dict(VERSIONS, **{"replies.json": "b2"}))
+
+
+def test_lru_ttl_and_clear(clock):
+    cache = ResponseCache(maxsize=2, ttl=10, clock=clock)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    assert cache.get("a") == {"n": 1}
+    cache.put("c", {"n": 3})  # evicts b, the least recently used
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    clock.now = 11
+    assert cache.get("a") is None
+
+    cache.put("d", {"n": 4})
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_size_zero_disables():
+    cache = ResponseCache(maxsize=0)
+    cache.put("a", {"n": 1})
+    assert not cache.enabled
+    assert cache.get("a") is None
@@ -0,0 +1,89 @@
+# tests/test_similarity.py
+
+import os
+
+from app.metrics import CLASSIFY_FALLBACK
+from app.similarity import SimilarityClassifier, features, interaction_examples
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+INTERACTIONS_DIR = os.path.join(ROOT, "interactions")
+
+EXAMPLES = [
+    ("my parcel has not arrived and tracking shows no delivery update", "late_delivery"),
+    ("the delivery is a week overdue, where is my parcel", "late_delivery"),
+    ("the screen cracked and the device stopped working", "defective_product"),
+    ("it stopped working after two days, is it under warranty", "defective_product"),
+]
+
+
+def test_features_fold_digits_and_truncate():
+    assert features("ORD1001") == features("ord9999")
+    assert features("hi") != {}
+    assert features("x" * 10 + " tail", max_chars=10) == features("x" * 10)
+    assert features("") == {}
+
+
+def test_shared_word_memo_does_not_change_features():
+    memo = {}
+    first = features("please check my parcel please", memo=memo)
+    assert "please" in memo
+    assert first == features("please check my parcel please")
+    assert features("my parcel is late", memo=memo) == features("my parcel is late")
+
+
+def test_scores_rank_nearest_centroid():
+    clf = SimilarityClassifier(EXAMPLES, min_score=0.0)
+    assert clf.labels == ["defective_product", "late_delivery"]
+    ranked = clf.scores("my parcel still has no delivery update")
+    assert ranked[0].issue_type == "late_delivery"
+    assert ranked[0].rules == ()
+    assert ranked[0].score > ranked[1].score
+    assert clf.scores("my kettle stopped working")[0].issue_type == "defective_product"
+
+
+def test_min_score_leaves_unrelated_text_unscored():
+    clf = SimilarityClassifier(EXAMPLES, min_score=0.2)
+    assert clf.scores("hi") == []
+    assert clf.scores("") == []
+
+
+def test_scores_many_budget_skips_tickets_over_it():
+    clf = SimilarityClassifier(EXAMPLES)
+    texts = ["where is my parcel", "it stopped working"]
+    assert clf.scores_many(texts) == [clf.scores(t) for t in texts]
+    assert clf.scores_many(texts, budget=1.0) == [clf.scores(t) for t in texts]
+
+    before = CLASSIFY_FALLBACK.value("skipped")
+    assert clf.scores_many(texts, budget=-1.0) == [[], []]
+    assert CLASSIFY_FALLBACK.value("skipped") == before + 2
+
+
+def test_budget_cuts_a_ticket_short_and_is_per_ticket(monkeypatch):
+    import app.similarity
+
+    class Ticking:
+        # every perf_counter() read advances the clock by one unit
+        now = 0.0
+
+        def perf_counter(self):
+            Ticking.now += 1
+            return Ticking.now
+
+    monkeypatch.setattr(app.similarity, "time", Ticking())
+    clf = SimilarityClassifier(EXAMPLES)
+    long_ticket = "my parcel " * 40  # dozens of budget checks
+    short_ticket = "parcel"  # a handful of them
+
+    before = CLASSIFY_FALLBACK.value("skipped")
+    ranked = clf.scores_many([long_ticket, short_ticket], budget=20)
+    assert ranked[0] == []
+    assert ranked[1] and ranked[1][0].issue_type == "late_delivery"
+    assert CLASSIFY_FALLBACK.value("skipped") == before + 1
+    assert clf.scores(long_ticket, deadline=Ticking.now + 5) is None
+
+
+def test_interaction_examples_are_labeled_user_turns():
+    examples = interaction_examples(INTERACTIONS_DIR)
+    assert examples
+    clf = SimilarityClassifier(examples)
+    assert len(clf) == len({label for _, label in examples})
@@ -0,0 +1,40 @@
+# tests/test_templates.py
+
+from app.templates import CompiledTemplate, ReplyTemplates
+
+REPLIES = [
+    {"issue_type": "refund_request", "template": "Hi {{customer_name}}, refund for {{order_id}}."},
+    {"issue_type": "late_delivery", "template": "{{customer_name}}: {{items}} is {{status}}, due {{delivery_date}}."},
+    {"issue_type": "refund_request", "template": "shadowed"},
+]
+
+ORDER = {
+    "order_id": "ORD1002",
+    "customer_name": "David Lee",
+    "items": [{"sku": "SKU-102-C", "name": "Bluetooth Speaker", "quantity": 1}],
+    "status": "shipped",
+    "delivery_date": "2025-01-20",
+}
+
+
+def test_render_matches_legacy_replace_chain():
+    templates = ReplyTemplates(REPLIES)
+    assert templates.render("refund_request", ORDER) == "Hi David Lee, refund for ORD1002."
+
+
+def test_render_arbitrary_order_fields():
+    templates = ReplyTemplates(REPLIES)
+    assert templates.render("late_delivery", ORDER) == (
+        "David Lee: Bluetooth Speaker is shipped, due 2025-01-20."
+    )
+
+
+def test_unknown_issue_and_empty_order_use_defaults():
+    templates = ReplyTemplates(REPLIES)
+    assert templates.render("nope", {}) == "Hi Customer, we are reviewing order ."
+
+
+def test_template_parsed_into_segments_once():
+    template = CompiledTemplate("{{a}}-{{ b }}-{{a}}")
+    assert template.fields == ["a", "b", "a"]
+    assert template.render({"a": 1, "b": "x"}) == "1-x-1"